@@ -1,51 +1,53 @@
+import functools
+import hmac
 import os
-import re
-from typing import Optional, Tuple, List, Dict, Union
-import gradio as gr
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from operator import itemgetter
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Optional, Tuple, List, Dict, Mapping, Union
 from PIL import Image
 from dotenv import load_dotenv
 
-from anki_gen.gemini_client import GeminiClient
-from anki_gen.card_generator import AnkiCardGenerator
+from anki_gen.cache import CACHE_DIR, DiskCache, GenerationCache, file_digest, image_digest
+from anki_gen.html_utils import strip_html, strip_html_batch
+
+if TYPE_CHECKING:
+    from anki_gen.gemini_client import GeminiClient
+    from anki_gen.card_generator import AnkiCardGenerator
 
 # Load environment variables
 load_dotenv()
 
+# Source types recorded in source_info["type"]
+_SOURCE_TYPE_PDF = sys.intern("PDF")
+_SOURCE_TYPE_IMAGE = sys.intern("image")
+_SOURCE_TYPE_FILE = sys.intern("file")
 
-class AnkiCardCreatorApp:
-    """Main application class for the Anki Card Creator."""
+# Maximum age of persisted extraction and card generation results
+_EXTRACTION_CACHE_TTL_SECONDS = 30 * 24 * 60 * 60
+_GENERATION_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
 
-    def __init__(self):
-        """Initialize the application."""
-        # Initialize Gemini client with environment variable
-        api_key = os.getenv("GOOGLE_API_KEY")
-        if not api_key:
-            raise ValueError("GOOGLE_API_KEY environment variable is required")
+# Gemini model used for extraction and card generation
+_GEMINI_MODEL_NAME = "gemini-1.5-flash"
 
-        self.gemini_client = GeminiClient(api_key=api_key)
-        self.card_generator = AnkiCardGenerator()
-        self.current_cards = []
-        self.existing_cards = []  # Store cards from uploaded deck
-        self.existing_deck_metadata = {}  # Store metadata from uploaded deck
-        self.current_text = ""
-        self.current_card_index = 0
-        self.prepared_prompts = self._get_prepared_prompts()
-        self.selected_cards = []  # Track which cards are selected for deck creation
+# Version of the card generation prompt and system instruction in gemini_client.py.
+# Bump it whenever they change so persisted generations from the old prompt are not reused.
+_CARD_PROMPT_VERSION = 2
 
-        # Multi-file support
-        self.source_files = []  # List of processed files with metadata
-        self.all_extracted_texts = []  # All extracted texts from multiple files
-        self.cards_by_source = {}  # Track which cards came from which source
+# Maximum number of concurrent Gemini extraction calls for multi-file uploads
+_MAX_EXTRACTION_WORKERS = 8
 
-    def _get_prepared_prompts(self) -> Dict[str, str]:
-        """Get dictionary of prepared prompts for different learning objectives.
+# Number of uploads the Gradio queue processes at the same time; every other event
+# keeps Gradio's default of one at a time
+_UPLOAD_CONCURRENCY_LIMIT = 4
 
-        Returns:
-            Dictionary mapping prompt names to descriptions
-        """
-        return {
-            "Custom (Enter your own)": "",
-            "Japanese Vocabulary (Intermediate)": """Create comprehensive Japanese vocabulary cards for intermediate students using HTML formatting for better structure. IMPORTANT: Only focus on native Japanese words written in kanji and/or hiragana. Avoid katakana words (foreign loanwords), proper names, and English words.
+# Prepared learning objectives offered in the prompt dropdown, keyed by display name
+_PREPARED_PROMPTS: Mapping[str, str] = MappingProxyType(
+    {
+        "Custom (Enter your own)": "",
+        "Japanese Vocabulary (Intermediate)": """Create comprehensive Japanese vocabulary cards for intermediate students using HTML formatting for better structure. IMPORTANT: Only focus on native Japanese words written in kanji and/or hiragana. Avoid katakana words (foreign loanwords), proper names, and English words.
 
 - Front: Display the <strong>kanji/word</strong> in large, clear text. If it is a kanji word, don't include the reading.
 - Back: Structure using HTML for readability:
@@ -64,7 +66,7 @@ class AnkiCardCreatorApp:
 Focus only on authentic Japanese vocabulary: kanji compounds, native Japanese words in hiragana, and traditional Japanese expressions. Skip any katakana words (foreign loanwords like コーヒー, コンピューター), proper names, or English words that might appear in the text.
 
 Use <strong> for key terms, <em> for emphasis, <ul><li> for lists, and background colors for highlighting.""",
-            "Spanish Vocabulary": """Create Spanish vocabulary cards with HTML formatting:
+        "Spanish Vocabulary": """Create Spanish vocabulary cards with HTML formatting:
 - Front: <strong>Spanish word/phrase</strong>
 - Back: Structure with HTML:
   • <strong>English meaning:</strong> translation
@@ -73,7 +75,7 @@ Use <strong> for key terms, <em> for emphasis, <ul><li> for lists, and backgroun
     <ul><li>Spanish sentence → <em>English translation</em></li></ul>
   • <strong>Gender/Type:</strong> [masculine/feminine, verb conjugation, etc.]
   • <div class="highlight">Usage notes or cultural context</div>""",
-            "Historical Facts & Dates": """Create historical flashcards with structured HTML formatting:
+        "Historical Facts & Dates": """Create historical flashcards with structured HTML formatting:
 - Front: <strong>Historical question or event prompt</strong>
 - Back: Comprehensive answer using:
   • <strong>Date/Period:</strong> <span style="background-color: #fff0f0; padding: 2px 6px; border-radius: 3px;">specific timeframe</span>
@@ -84,7 +86,7 @@ Use <strong> for key terms, <em> for emphasis, <ul><li> for lists, and backgroun
     <ul><li>Causes leading to the event</li><li>Consequences</li></ul>
   • <em>Connections:</em> Related events or impacts
 Use <strong> for dates and names, <ul><li> for multiple points, and <div class="highlight"> for key significance.""",
-            "Mathematical Formulas": """Create mathematical concept cards with clear HTML structure:
+        "Mathematical Formulas": """Create mathematical concept cards with clear HTML structure:
 - Front: <strong>Mathematical concept or problem</strong>
 - Back: Well-formatted explanation:
   • <strong>Formula:</strong> <code>mathematical expression</code>
@@ -98,7 +100,7 @@ Use <strong> for dates and names, <ul><li> for multiple points, and <div class="
     <ol><li>Step 1: <code>calculation</code></li><li>Step 2: <code>calculation</code></li></ol>
   • <em>Notes:</em> Important considerations or common mistakes
 Use <code> for all mathematical expressions, <ol><li> for steps, and <strong> for key concepts.""",
-            "Scientific Terms": """Create scientific terminology cards with structured HTML:
+        "Scientific Terms": """Create scientific terminology cards with structured HTML:
 - Front: <strong>Scientific term or concept</strong>
 - Back: Comprehensive definition with structure:
   • <strong>Definition:</strong> Clear, concise explanation
@@ -109,7 +111,7 @@ Use <code> for all mathematical expressions, <ol><li> for steps, and <strong> fo
   • <strong>Related terms:</strong> Connected concepts
   • <div class="highlight">Clinical/practical significance</div>
 Use <strong> for definitions, <em> for scientific names, and <ul><li> for lists of characteristics.""",
-            "Business & Finance": """Create business and finance cards with professional HTML formatting:
+        "Business & Finance": """Create business and finance cards with professional HTML formatting:
 - Front: <strong>Business term or financial concept</strong>
 - Back: Professional explanation with structure:
   • <strong>Definition:</strong> Clear business explanation
@@ -121,20 +123,298 @@ Use <strong> for definitions, <em> for scientific names, and <ul><li> for lists
   • <em>Best practices:</em> When and how to apply
   • <span style="background-color: #ffe6e6; padding: 2px 4px; border-radius: 3px;">Risk factors:</span> Important considerations
 Use <strong> for key terms, <code> for formulas, and background colors for risks vs benefits.""",
-        }
+    }
+)
+
+# Prompt names in dropdown order
+_PROMPT_CHOICES = tuple(_PREPARED_PROMPTS)
+_CUSTOM_PROMPT = _PROMPT_CHOICES[0]
+
+# Constant outputs for the card viewer when no cards exist
+_NO_CARDS_LABEL = "No cards generated"
+_EMPTY_CARD_HTML = "<div style='text-align: center; padding: 20px;'>No cards available</div>"
+_EMPTY_RENDER = (_EMPTY_CARD_HTML, "No cards", "Show Answer", 0, 0)
+_EMPTY_NAV = _EMPTY_RENDER[:3]
+
+# Card viewer placeholders shown before any cards exist
+_VIEWER_PLACEHOLDER_HTML = "<div style='text-align: center; padding: 40px; color: #666;'>Generate cards to see them here</div>"
+_VIEWER_CLEARED_HTML = "<div style='text-align: center; padding: 40px; color: #666;'>Add sources and generate cards to see them here</div>"
+
+# Columns of the card selection table
+_SELECTION_HEADERS = ["Include", "Card"]
+
+# Card viewer templates, filled with str.format on every navigation/flip
+_CARD_ANSWER_HTML = """
+            <div class="card-preview" style="max-width: 600px; margin: 0 auto; font-family: Arial, sans-serif;">
+                <div style="background: #f8f9fa; border-left: 4px solid #007bff; padding: 20px; margin-bottom: 20px; border-radius: 8px;">
+                    <h3 style="margin-top: 0; color: #000000 !important;">Question:</h3>
+                    <div style="font-size: 16px; line-height: 1.5; color: #000000 !important;">{front}</div>
+                </div>
+                <div style="background: #e8f5e8; border-left: 4px solid #28a745; padding: 20px; border-radius: 8px;">
+                    <h3 style="margin-top: 0; color: #000000 !important;">Answer:</h3>
+                    <div style="font-size: 16px; line-height: 1.5; color: #000000 !important;">{back}</div>
+                </div>
+            </div>
+            """
+
+_CARD_QUESTION_HTML = """
+            <div class="card-preview" style="max-width: 600px; margin: 0 auto; font-family: Arial, sans-serif;">
+                <div style="background: #f8f9fa; border-left: 4px solid #007bff; padding: 20px; border-radius: 8px; text-align: center;">
+                    <h3 style="margin-top: 0; color: #000000 !important;">Question:</h3>
+                    <div style="font-size: 18px; line-height: 1.6; font-weight: 500; color: #000000 !important;">{front}</div>
+                    <hr style="margin: 20px 0; border: none; border-top: 2px solid #dee2e6;">
+                    <p style="color: #000000 !important; font-style: italic;">Click "Show Answer" to reveal the answer</p>
+                </div>
+            </div>
+            """
+
+
+def _noop_progress(*args, **kwargs) -> None:
+    """Progress callback used when no Gradio progress tracker is given."""
+
+
+def _is_blank(text: str) -> bool:
+    """Check whether a text is empty or whitespace only, without copying it.
+
+    Args:
+        text: Text to check
+
+    Returns:
+        True if the text has no non-whitespace characters
+    """
+    return not text or text.isspace()
+
+
+def _is_checked(value: Union[bool, str, None]) -> bool:
+    """Convert a selection table checkbox cell to a bool.
+
+    Args:
+        value: Cell value, a bool or its string form depending on the Gradio version
+
+    Returns:
+        True if the checkbox is ticked
+    """
+    if isinstance(value, str):
+        return value.strip().lower() == "true"
+    return bool(value)
+
+
+def _plain_fronts(cards: List[Dict[str, str]]) -> List[str]:
+    """Get the plain-text front of every card.
+
+    Args:
+        cards: List of card dictionaries
+
+    Returns:
+        Fronts with HTML removed, in card order
+    """
+    if not cards:
+        return []
+    return strip_html_batch([card.get("front") or "No question" for card in cards])
+
+
+def _truncate(text: str, max_len: int) -> str:
+    """Cut a text to max_len characters, marking the cut with "...".
+
+    Args:
+        text: Text to shorten
+        max_len: Maximum number of characters kept from the text
+
+    Returns:
+        The text itself if it fits, otherwise its first max_len characters plus "..."
+    """
+    if len(text) > max_len:
+        return text[:max_len] + "..."
+    return text
+
+
+def _build_card_previews(fronts: List[str], max_len: int) -> List[str]:
+    """Build "Card N: ..." preview labels from plain-text card fronts.
+
+    Args:
+        fronts: Plain-text card fronts, as returned by _plain_fronts
+        max_len: Maximum number of front characters shown before "..."
+
+    Returns:
+        List of preview labels, one per card
+    """
+    return [f"Card {i}: {_truncate(front, max_len)}" for i, front in enumerate(fronts, 1)]
+
+
+@functools.lru_cache(maxsize=16)
+def _prompt_description(prompt_name: str) -> str:
+    """Look up a prepared prompt's description, memoized for repeated dropdown events.
+
+    Args:
+        prompt_name: Name of the selected prompt
+
+    Returns:
+        Prompt description or empty string for custom/unknown prompts
+    """
+    return _PREPARED_PROMPTS.get(prompt_name, "")
+
+
+class AnkiCardCreatorApp:
+    """Main application class for the Anki Card Creator."""
+
+    # Index offsets for navigate_card directions
+    _NAV_DELTAS = {"next": 1, "prev": -1}
+
+    def __init__(self):
+        """Initialize the application."""
+        # Initialize Gemini client with environment variable
+        api_key = os.getenv("GOOGLE_API_KEY")
+        if not api_key:
+            raise ValueError("GOOGLE_API_KEY environment variable is required")
+
+        self._api_key = api_key
+        self.generation_cache = GenerationCache(
+            disk_cache=DiskCache(
+                os.path.join(CACHE_DIR, "generate"), ttl_seconds=_GENERATION_CACHE_TTL_SECONDS
+            ),
+            version=f"{_GEMINI_MODEL_NAME}:{_CARD_PROMPT_VERSION}",
+        )
+        self.extraction_cache = DiskCache(
+            os.path.join(CACHE_DIR, "extract"), ttl_seconds=_EXTRACTION_CACHE_TTL_SECONDS
+        )
+        self.current_cards = []
+        self.existing_cards = []  # Store cards from uploaded deck
+        self.existing_deck_metadata = {}  # Store metadata from uploaded deck
+        self.current_text = ""
+        self.current_card_index = 0
+        self.prepared_prompts = _PREPARED_PROMPTS
+        self._prompt_choices = _PROMPT_CHOICES
+        self.selected_cards = []  # Track which cards are selected for deck creation
+        self._selection_choices_cache: List[str] = []  # Selection labels for current_cards
+        self._card_list_cache: List[str] = []  # Dropdown labels for current_cards
+        self._card_label_to_index: Dict[str, int] = {}  # Dropdown label -> card index
+        self._selection_label_to_index: Dict[str, int] = {}  # Selection label -> card index
+
+        # Multi-file support; uploads may finish concurrently, so source mutation is locked
+        self._sources_lock = threading.Lock()
+        self.source_files = []  # List of processed files with metadata
+        self.all_extracted_texts = []  # All extracted texts from multiple files
+        self._total_chars = 0  # Running sum of len(text) over all_extracted_texts
+        self.cards_by_source = {}  # Track which cards came from which source
+        self._sources_summary_cache: Optional[str] = None  # Rendered get_sources_summary
+
+    @functools.cached_property
+    def gemini_client(self) -> "GeminiClient":
+        """Gemini client, created on first use so google.generativeai is imported lazily."""
+        # pylint: disable-next=import-outside-toplevel
+        from anki_gen.gemini_client import GeminiClient
+
+        return GeminiClient(api_key=self._api_key, model_name=_GEMINI_MODEL_NAME)
+
+    @functools.cached_property
+    def card_generator(self) -> "AnkiCardGenerator":
+        """Anki card generator, created on first use so genanki is imported lazily."""
+        # pylint: disable-next=import-outside-toplevel
+        from anki_gen.card_generator import AnkiCardGenerator
+
+        return AnkiCardGenerator()
+
+    def _extract_cached(self, file_input: Union[Image.Image, str]) -> str:
+        """Extract text from a file, reusing earlier results for identical content.
+
+        Args:
+            file_input: PIL Image or path to an image/PDF file
+
+        Returns:
+            Extracted text content
+        """
+        if isinstance(file_input, str):
+            key = file_digest(file_input)
+        else:
+            key = image_digest(file_input)
+
+        cached_text = self.extraction_cache.get(key)
+        if cached_text is not None:
+            return cached_text
+
+        extracted_text = self.gemini_client.extract_text_from_file(file_input)
+        # A blank result may be a transient failure, so leave it out of the cache and
+        # let the next upload of the same file ask Gemini again
+        if not _is_blank(extracted_text):
+            self.extraction_cache.set(key, extracted_text)
+        return extracted_text
+
+    def _describe_source(self, file_input: Union[Image.Image, str]) -> Tuple[Optional[str], str]:
+        """Get the display name and type of a source about to be added.
+
+        Images have no name of their own; they are numbered by ``_add_source``.
+
+        Args:
+            file_input: PIL Image or file path
+
+        Returns:
+            Tuple of (filename, file_type); filename is None for images
+        """
+        if isinstance(file_input, str):
+            file_type = (
+                _SOURCE_TYPE_PDF if file_input.lower().endswith(".pdf") else _SOURCE_TYPE_FILE
+            )
+            filename = os.path.basename(file_input) if file_input else "uploaded_file"
+        else:
+            file_type = _SOURCE_TYPE_IMAGE
+            filename = None
+        return filename, file_type
+
+    def _add_source(self, filename: Optional[str], file_type: str, extracted_text: str) -> str:
+        """Record an extracted source and append its text to the combined text.
+
+        Args:
+            filename: Display name of the source, or None to number it as an image
+            file_type: Type of the source ("PDF", "image" or "file")
+            extracted_text: Text extracted from the source
+
+        Returns:
+            The display name the source was recorded under
+        """
+        with self._sources_lock:
+            if filename is None:
+                filename = f"image_{len(self.source_files) + 1}"
+
+            # Add to source files tracking
+            source_info = {
+                "filename": sys.intern(filename),
+                "type": file_type,
+                "text_length": len(extracted_text),
+                "text": extracted_text,
+                "timestamp": len(self.source_files) + 1,  # Simple counter
+            }
+            source_info["summary_line"] = (
+                f"  {source_info['timestamp']}. **{filename}** ({file_type}) - {len(extracted_text):,} characters"
+            )
+
+            self.source_files.append(source_info)
+            self._sources_summary_cache = None
+            self.all_extracted_texts.append(extracted_text)
+            self._total_chars += len(extracted_text)
+
+            # Append to combined current text instead of re-joining every source
+            if self.current_text:
+                self.current_text += "\n\n" + extracted_text
+            else:
+                self.current_text = extracted_text
+
+        return filename
 
     def process_file(
-        self, file_input: Union[Image.Image, str], progress=gr.Progress()
+        self, file_input: Union[Image.Image, str], progress=None
     ) -> Tuple[str, str, str, str]:
         """Process uploaded file (image or PDF) to extract text.
 
         Args:
             file_input: Uploaded PIL Image or file path
-            progress: Gradio progress tracker
+            progress: Gradio progress tracker, or None to skip progress updates
 
         Returns:
             Tuple of (status_message, extracted_text, text_preview, sources_summary)
         """
+        if progress is None:
+            progress = _noop_progress
+
         if file_input is None:
             return "❌ Please upload a file.", "", "", self.get_sources_summary()
 
@@ -142,53 +422,33 @@ Use <strong> for key terms, <code> for formulas, and background colors for risks
 
         try:
             # Determine file type and set progress message
-            if isinstance(file_input, str):
-                file_type = "PDF" if file_input.lower().endswith(".pdf") else "file"
-                filename = os.path.basename(file_input) if file_input else "uploaded_file"
-                progress(0.3, desc=f"Extracting text from {file_type}...")
-            else:
-                file_type = "image"
-                filename = f"image_{len(self.source_files) + 1}"
-                progress(0.3, desc="Extracting text from image...")
+            filename, file_type = self._describe_source(file_input)
+            progress(0.3, desc=f"Extracting text from {file_type}...")
 
             # Extract text using Gemini
-            extracted_text = self.gemini_client.extract_text_from_file(file_input)
+            extracted_text = self._extract_cached(file_input)
 
             progress(0.8, desc="Processing results...")
 
-            if not extracted_text.strip():
+            if _is_blank(extracted_text):
                 return (
-                    f"⚠️ No text could be extracted from {filename}. Please try a different file.",
+                    f"⚠️ No text could be extracted from {filename or 'the image'}. Please try a different file.",
                     "",
                     "",
                     self.get_sources_summary(),
                 )
 
-            # Add to source files tracking
-            source_info = {
-                "filename": filename,
-                "type": file_type,
-                "text_length": len(extracted_text),
-                "text": extracted_text,
-                "timestamp": len(self.source_files) + 1,  # Simple counter
-            }
-
-            self.source_files.append(source_info)
-            self.all_extracted_texts.append(extracted_text)
-
-            # Update combined current text
-            self.current_text = "\n\n".join(self.all_extracted_texts)
+            filename = self._add_source(filename, file_type, extracted_text)
 
             # Create preview (first 500 characters of this file's text)
-            preview = extracted_text[:500] + ("..." if len(extracted_text) > 500 else "")
+            preview = _truncate(extracted_text, 500)
 
             progress(1.0, desc="Complete!")
 
-            total_chars = sum(len(text) for text in self.all_extracted_texts)
             sources_summary = self.get_sources_summary()
 
             return (
-                f"✅ Successfully extracted {len(extracted_text)} characters from {filename}! Total: {total_chars} characters from {len(self.source_files)} source(s).",
+                f"✅ Successfully extracted {len(extracted_text)} characters from {filename}! Total: {self._total_chars} characters from {len(self.source_files)} source(s).",
                 extracted_text,
                 preview,
                 sources_summary,
@@ -197,23 +457,100 @@ Use <strong> for key terms, <code> for formulas, and background colors for risks
         except Exception as e:
             return f"❌ Error processing file: {str(e)}", "", "", self.get_sources_summary()
 
+    def process_files(
+        self, file_inputs: List[Union[Image.Image, str]], progress=None
+    ) -> Tuple[str, str, str, str]:
+        """Process several uploaded files, extracting their text concurrently.
+
+        Args:
+            file_inputs: Uploaded PIL Images or file paths
+            progress: Gradio progress tracker, or None to skip progress updates
+
+        Returns:
+            Tuple of (status_message, extracted_text, text_preview, sources_summary)
+        """
+        if progress is None:
+            progress = _noop_progress
+
+        file_inputs = [f for f in file_inputs or [] if f is not None]
+        if len(file_inputs) <= 1:
+            return self.process_file(file_inputs[0] if file_inputs else None, progress)
+
+        total_files = len(file_inputs)
+        progress(0.1, desc=f"Extracting text from {total_files} files...")
+
+        # Gemini calls are network-bound, so run them side by side
+        extracted_texts: List[Optional[str]] = [None] * total_files
+        errors: Dict[int, str] = {}
+        with ThreadPoolExecutor(max_workers=min(_MAX_EXTRACTION_WORKERS, total_files)) as executor:
+            futures = {
+                executor.submit(self._extract_cached, file_input): i
+                for i, file_input in enumerate(file_inputs)
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                i = futures[future]
+                try:
+                    extracted_texts[i] = future.result()
+                except Exception as e:
+                    errors[i] = str(e)
+                progress(
+                    0.1 + 0.8 * done / total_files,
+                    desc=f"Extracted {done} of {total_files} files...",
+                )
+
+        # Add sources in upload order so numbering matches what the user picked
+        messages = []
+        added_texts = []
+        for i, file_input in enumerate(file_inputs):
+            filename, file_type = self._describe_source(file_input)
+            extracted_text = extracted_texts[i]
+
+            if i in errors:
+                messages.append(f"❌ Error processing {filename or f'image {i + 1}'}: {errors[i]}")
+            elif _is_blank(extracted_text):
+                messages.append(
+                    f"⚠️ No text could be extracted from {filename or f'image {i + 1}'}."
+                )
+            else:
+                self._add_source(filename, file_type, extracted_text)
+                added_texts.append(extracted_text)
+
+        progress(1.0, desc="Complete!")
+
+        if not added_texts:
+            return "\n".join(messages), "", "", self.get_sources_summary()
+
+        latest_text = added_texts[-1]
+        preview = _truncate(latest_text, 500)
+        messages.insert(
+            0,
+            f"✅ Successfully extracted text from {len(added_texts)} of {total_files} files! Total: {self._total_chars} characters from {len(self.source_files)} source(s).",
+        )
+
+        return "\n".join(messages), "\n\n".join(added_texts), preview, self.get_sources_summary()
+
     def generate_cards(
-        self, learning_objective: str, num_cards: int, progress=gr.Progress()
+        self, learning_objective: str, num_cards: int, progress=None, use_cache: bool = True
     ) -> Tuple[str, str, str]:
         """Generate study cards based on all extracted texts and learning objective.
 
         Args:
             learning_objective: What the user wants to learn
             num_cards: Number of cards to generate
-            progress: Gradio progress tracker
+            progress: Gradio progress tracker, or None to skip progress updates
+            use_cache: Whether to reuse cards generated earlier for the same sources and
+                objective; False always asks Gemini for a fresh set
 
         Returns:
             Tuple of (status_message, cards_preview, download_info)
         """
-        if not self.current_text.strip():
+        if progress is None:
+            progress = _noop_progress
+
+        if _is_blank(self.current_text):
             return "❌ Please extract text from at least one file first.", "", ""
 
-        if not learning_objective.strip():
+        if _is_blank(learning_objective):
             return "❌ Please describe what you want to learn.", "", ""
 
         if self.gemini_client is None:
@@ -226,10 +563,18 @@ Use <strong> for key terms, <code> for formulas, and background colors for risks
         try:
             progress(0.2, desc="Generating study cards from all sources...")
 
-            # Generate cards using Gemini with combined text from all sources
-            new_cards = self.gemini_client.generate_study_cards(
-                self.current_text, learning_objective, num_cards
-            )
+            # Reuse cards generated earlier for the same sources and objective
+            new_cards = None
+            if use_cache:
+                new_cards = self.generation_cache.get(
+                    self.current_text, learning_objective, num_cards
+                )
+            from_cache = new_cards is not None
+            if not from_cache:
+                # Generate cards using Gemini with combined text from all sources
+                new_cards = self.gemini_client.generate_study_cards(
+                    self.current_text, learning_objective, num_cards
+                )
 
             progress(0.6, desc="Validating cards...")
 
@@ -240,9 +585,15 @@ Use <strong> for key terms, <code> for formulas, and background colors for risks
                 error_msg = "❌ Generated cards have issues:\n" + "\n".join(validation["errors"])
                 return error_msg, "", ""
 
+            if not from_cache:
+                self.generation_cache.set(
+                    self.current_text, learning_objective, num_cards, new_cards
+                )
+
             # Replace current cards with new ones (full regeneration)
             self.current_cards = new_cards
             self.current_card_index = 0  # Reset to first card
+            self._refresh_card_labels()
 
             # Select all cards by default
             self.selected_cards = list(range(len(self.current_cards)))
@@ -255,10 +606,9 @@ Use <strong> for key terms, <code> for formulas, and background colors for risks
             progress(1.0, desc="Complete!")
 
             source_count = len(self.source_files)
-            total_chars = sum(len(text) for text in self.all_extracted_texts)
 
             return (
-                f"✅ Generated {len(new_cards)} study cards from {source_count} source(s) ({total_chars:,} characters)!",
+                f"✅ Generated {len(new_cards)} study cards from {source_count} source(s) ({self._total_chars:,} characters)!",
                 preview,
                 f"Ready to download deck with {len(new_cards)} cards",
             )
@@ -266,16 +616,19 @@ Use <strong> for key terms, <code> for formulas, and background colors for risks
         except Exception as e:
             return f"❌ Error generating cards: {str(e)}", "", ""
 
-    def create_anki_deck(self, deck_name: str, progress=gr.Progress()) -> Tuple[str, Optional[str]]:
+    def create_anki_deck(self, deck_name: str, progress=None) -> Tuple[str, Optional[str]]:
         """Create and download Anki deck file.
 
         Args:
             deck_name: Name for the Anki deck
-            progress: Gradio progress tracker
+            progress: Gradio progress tracker, or None to skip progress updates
 
         Returns:
             Tuple of (status_message, file_path_or_none)
         """
+        if progress is None:
+            progress = _noop_progress
+
         if not self.current_cards:
             return "❌ No cards available. Please generate cards first.", None
 
@@ -288,7 +641,7 @@ Use <strong> for key terms, <code> for formulas, and background colors for risks
         else:
             selection_note = f" ({len(cards_to_include)} selected cards)"
 
-        if not deck_name.strip():
+        if _is_blank(deck_name):
             deck_name = "AI Study Cards"
 
         try:
@@ -316,16 +669,9 @@ Use <strong> for key terms, <code> for formulas, and background colors for risks
             List of card titles with indices
         """
         if not self.current_cards:
-            return ["No cards generated"]
-
-        card_list = []
-        for i, card in enumerate(self.current_cards):
-            front_preview = card.get("front", "No question")[:50]
-            if len(front_preview) >= 50:
-                front_preview += "..."
-            card_list.append(f"Card {i+1}: {front_preview}")
+            return [_NO_CARDS_LABEL]
 
-        return card_list
+        return list(self._card_list_cache)
 
     def render_current_card(self, show_answer: bool = False) -> Tuple[str, str, str, int, int]:
         """Render the current card in HTML format.
@@ -337,49 +683,24 @@ Use <strong> for key terms, <code> for formulas, and background colors for risks
             Tuple of (card_html, navigation_info, flip_button_text, current_index, total_cards)
         """
         if not self.current_cards:
-            return (
-                "<div style='text-align: center; padding: 20px;'>No cards available</div>",
-                "No cards",
-                "Show Answer",
-                0,
-                0,
-            )
+            return _EMPTY_RENDER
 
+        total_cards = len(self.current_cards)
         card = self.current_cards[self.current_card_index]
         front = card.get("front", "No question")
-        back = card.get("back", "No answer")
 
         # Create HTML for the card
         if show_answer:
-            card_html = f"""
-            <div class="card-preview" style="max-width: 600px; margin: 0 auto; font-family: Arial, sans-serif;">
-                <div style="background: #f8f9fa; border-left: 4px solid #007bff; padding: 20px; margin-bottom: 20px; border-radius: 8px;">
-                    <h3 style="margin-top: 0; color: #000000 !important;">Question:</h3>
-                    <div style="font-size: 16px; line-height: 1.5; color: #000000 !important;">{front}</div>
-                </div>
-                <div style="background: #e8f5e8; border-left: 4px solid #28a745; padding: 20px; border-radius: 8px;">
-                    <h3 style="margin-top: 0; color: #000000 !important;">Answer:</h3>
-                    <div style="font-size: 16px; line-height: 1.5; color: #000000 !important;">{back}</div>
-                </div>
-            </div>
-            """
+            back = card.get("back", "No answer")
+            card_html = _CARD_ANSWER_HTML.format(front=front, back=back)
             flip_text = "Show Question Only"
         else:
-            card_html = f"""
-            <div class="card-preview" style="max-width: 600px; margin: 0 auto; font-family: Arial, sans-serif;">
-                <div style="background: #f8f9fa; border-left: 4px solid #007bff; padding: 20px; border-radius: 8px; text-align: center;">
-                    <h3 style="margin-top: 0; color: #000000 !important;">Question:</h3>
-                    <div style="font-size: 18px; line-height: 1.6; font-weight: 500; color: #000000 !important;">{front}</div>
-                    <hr style="margin: 20px 0; border: none; border-top: 2px solid #dee2e6;">
-                    <p style="color: #000000 !important; font-style: italic;">Click "Show Answer" to reveal the answer</p>
-                </div>
-            </div>
-            """
+            card_html = _CARD_QUESTION_HTML.format(front=front)
             flip_text = "Show Answer"
 
-        nav_info = f"Card {self.current_card_index + 1} of {len(self.current_cards)}"
+        nav_info = f"Card {self.current_card_index + 1} of {total_cards}"
 
-        return (card_html, nav_info, flip_text, self.current_card_index, len(self.current_cards))
+        return (card_html, nav_info, flip_text, self.current_card_index, total_cards)
 
     def navigate_card(self, direction: str) -> Tuple[str, str, str]:
         """Navigate to next or previous card.
@@ -391,12 +712,11 @@ Use <strong> for key terms, <code> for formulas, and background colors for risks
             Tuple of (card_html, navigation_info, flip_button_text)
         """
         if not self.current_cards:
-            return self.render_current_card()[:3]
+            return _EMPTY_NAV
 
-        if direction == "next" and self.current_card_index < len(self.current_cards) - 1:
-            self.current_card_index += 1
-        elif direction == "prev" and self.current_card_index > 0:
-            self.current_card_index -= 1
+        delta = self._NAV_DELTAS.get(direction, 0)
+        last_index = len(self.current_cards) - 1
+        self.current_card_index = max(0, min(last_index, self.current_card_index + delta))
 
         return self.render_current_card()[:3]
 
@@ -409,15 +729,15 @@ Use <strong> for key terms, <code> for formulas, and background colors for risks
         Returns:
             Tuple of (card_html, navigation_info, flip_button_text)
         """
-        if not self.current_cards or card_selection == "No cards generated":
+        if not self.current_cards:
+            return _EMPTY_NAV
+        if card_selection == _NO_CARDS_LABEL:
             return self.render_current_card()[:3]
 
-        try:
-            # Extract card index from selection (format: "Card X: ...")
-            card_num = int(card_selection.split(":")[0].replace("Card ", ""))
-            self.current_card_index = card_num - 1
-        except (ValueError, IndexError):
-            pass  # Keep current index if parsing fails
+        # Labels are indexed when cards change; unknown labels keep the current card
+        card_index = self._card_label_to_index.get(card_selection)
+        if card_index is not None:
+            self.current_card_index = card_index
 
         return self.render_current_card()[:3]
 
@@ -430,16 +750,19 @@ Use <strong> for key terms, <code> for formulas, and background colors for risks
         Returns:
             Tuple of (card_html, navigation_info, flip_button_text)
         """
+        if not self.current_cards:
+            return _EMPTY_NAV
+
         show_answer = current_flip_text == "Show Answer"
         return self.render_current_card(show_answer)[:3]
 
-    def get_prompt_choices(self) -> List[str]:
-        """Get list of available prompt choices for the dropdown.
+    def get_prompt_choices(self) -> Tuple[str, ...]:
+        """Get available prompt choices for the dropdown.
 
         Returns:
-            List of prompt names
+            Tuple of prompt names
         """
-        return list(self.prepared_prompts.keys())
+        return self._prompt_choices
 
     def get_prompt_description(self, prompt_name: str) -> str:
         """Get the description for a selected prompt.
@@ -450,7 +773,7 @@ Use <strong> for key terms, <code> for formulas, and background colors for risks
         Returns:
             Prompt description or empty string for custom
         """
-        return self.prepared_prompts.get(prompt_name, "")
+        return _prompt_description(prompt_name)
 
     def get_card_selection_data(self) -> List[Dict[str, Union[str, bool]]]:
         """Get card data with selection status for the checkboxes.
@@ -461,20 +784,18 @@ Use <strong> for key terms, <code> for formulas, and background colors for risks
         if not self.current_cards:
             return []
 
+        selected_set = set(self.selected_cards)
         card_data = []
         for i, card in enumerate(self.current_cards):
-            front_preview = card.get("front", "No question")[:80]
-            if len(front_preview) >= 80:
-                front_preview += "..."
-
-            # Remove HTML tags for preview
-            front_clean = re.sub(r"<[^>]+>", "", front_preview)
+            # Remove HTML before truncating so tags are never cut in half
+            front = strip_html(card.get("front", "No question"))
+            front_clean = _truncate(front, 80)
 
             card_data.append(
                 {
                     "index": i,
                     "preview": f"Card {i+1}: {front_clean}",
-                    "selected": i in self.selected_cards,
+                    "selected": i in selected_set,
                     "front": card.get("front", ""),
                     "back": card.get("back", ""),
                 }
@@ -482,6 +803,36 @@ Use <strong> for key terms, <code> for formulas, and background colors for risks
 
         return card_data
 
+    def _refresh_card_labels(self) -> None:
+        """Rebuild the dropdown and selection labels after current_cards changes."""
+        # Strip HTML once and derive both label sets from the same plain-text fronts
+        fronts = _plain_fronts(self.current_cards)
+        self._card_list_cache = _build_card_previews(fronts, 50)
+        self._card_label_to_index = {label: i for i, label in enumerate(self._card_list_cache)}
+        self._selection_choices_cache = _build_card_previews(fronts, 60)
+        self._selection_label_to_index = {
+            label: i for i, label in enumerate(self._selection_choices_cache)
+        }
+
+    def get_selection_choices(self) -> List[str]:
+        """Get the labels for the card selection table.
+
+        Returns:
+            List of "Card N: ..." labels, one per current card
+        """
+        return self._selection_choices_cache
+
+    def get_selection_index(self, label: str) -> Optional[int]:
+        """Get the card index behind a selection table label.
+
+        Args:
+            label: "Card N: ..." label from the selection table
+
+        Returns:
+            Index of the card, or None if the label does not belong to a current card
+        """
+        return self._selection_label_to_index.get(label)
+
     def update_card_selection(self, selected_indices: List[int]) -> str:
         """Update which cards are selected for deck creation.
 
@@ -509,7 +860,14 @@ Use <strong> for key terms, <code> for formulas, and background colors for risks
         if not self.current_cards or not self.selected_cards:
             return []
 
-        return [self.current_cards[i] for i in self.selected_cards if i < len(self.current_cards)]
+        n = len(self.current_cards)
+        valid_indices = [i for i in self.selected_cards if 0 <= i < n]
+        if not valid_indices:
+            return []
+        if len(valid_indices) == 1:
+            return [self.current_cards[valid_indices[0]]]
+
+        return list(itemgetter(*valid_indices)(self.current_cards))
 
     def get_sources_summary(self) -> str:
         """Get a summary of all processed source files.
@@ -517,22 +875,23 @@ Use <strong> for key terms, <code> for formulas, and background colors for risks
         Returns:
             Formatted string summarizing all source files
         """
-        if not self.source_files:
-            return "No files processed yet"
+        with self._sources_lock:
+            if self._sources_summary_cache is not None:
+                return self._sources_summary_cache
+
+            if not self.source_files:
+                self._sources_summary_cache = "No files processed yet"
+                return self._sources_summary_cache
 
-        summary_lines = ["📁 **Processed Sources:**"]
-        total_chars = 0
+            summary_lines = ["📁 **Processed Sources:**"]
+            summary_lines.extend(source["summary_line"] for source in self.source_files)
 
-        for i, source in enumerate(self.source_files, 1):
-            total_chars += source["text_length"]
             summary_lines.append(
-                f"  {i}. **{source['filename']}** ({source['type']}) - {source['text_length']:,} characters"
+                f"\n**Total:** {len(self.source_files)} files, {self._total_chars:,} characters"
             )
 
-        summary_lines.append(
-            f"\n**Total:** {len(self.source_files)} files, {total_chars:,} characters"
-        )
-        return "\n".join(summary_lines)
+            self._sources_summary_cache = "\n".join(summary_lines)
+            return self._sources_summary_cache
 
     def clear_all_sources(self) -> Tuple[str, str, str]:
         """Clear all processed sources and start fresh.
@@ -540,12 +899,22 @@ Use <strong> for key terms, <code> for formulas, and background colors for risks
         Returns:
             Tuple of (status_message, empty_text, sources_summary)
         """
-        self.source_files = []
-        self.all_extracted_texts = []
-        self.current_text = ""
+        with self._sources_lock:
+            self.source_files = []
+            self._sources_summary_cache = None
+            self.all_extracted_texts = []
+            self._total_chars = 0
+            self.current_text = ""
+        # Starting fresh also discards cached generations, so the same sources and
+        # objective can produce a new set of cards
+        self.generation_cache.clear()
         self.current_cards = []
         self.cards_by_source = {}
         self.selected_cards = []
+        self._selection_choices_cache = []
+        self._card_list_cache = []
+        self._card_label_to_index = {}
+        self._selection_label_to_index = {}
         self.current_card_index = 0
 
         return (
@@ -555,22 +924,25 @@ Use <strong> for key terms, <code> for formulas, and background colors for risks
         )
 
     def generate_cards_from_latest_source(
-        self, learning_objective: str, num_cards: int, progress=gr.Progress()
+        self, learning_objective: str, num_cards: int, progress=None
     ) -> Tuple[str, str, str]:
         """Generate cards from the most recently added source only.
 
         Args:
             learning_objective: What the user wants to learn
             num_cards: Number of cards to generate
-            progress: Gradio progress tracker
+            progress: Gradio progress tracker, or None to skip progress updates
 
         Returns:
             Tuple of (status_message, cards_preview, download_info)
         """
+        if progress is None:
+            progress = _noop_progress
+
         if not self.source_files:
             return "❌ Please add at least one source file first.", "", ""
 
-        if not learning_objective.strip():
+        if _is_blank(learning_objective):
             return "❌ Please describe what you want to learn.", "", ""
 
         if self.gemini_client is None:
@@ -587,7 +959,8 @@ Use <strong> for key terms, <code> for formulas, and background colors for risks
             latest_source = self.source_files[-1]
             latest_text = latest_source["text"]
 
-            # Generate cards using Gemini for this source only
+            # Always ask Gemini here: this path adds to the existing cards, so serving
+            # an earlier generation would only append the same cards again
             new_cards = self.gemini_client.generate_study_cards(
                 latest_text, learning_objective, num_cards
             )
@@ -601,12 +974,25 @@ Use <strong> for key terms, <code> for formulas, and background colors for risks
                 error_msg = "❌ Generated cards have issues:\n" + "\n".join(validation["errors"])
                 return error_msg, "", ""
 
+            # Drop cards already in the collection; their GUIDs would collide on export
+            existing = {(card["front"], card["back"]) for card in self.current_cards}
+            new_cards = [
+                card for card in new_cards if (card["front"], card["back"]) not in existing
+            ]
+            if not new_cards:
+                return (
+                    "⚠️ All generated cards are already in the collection. Try a different learning objective.",
+                    self.card_generator.preview_cards(self.current_cards),
+                    f"Ready to download deck with {len(self.current_cards)} cards",
+                )
+
             # Track which cards came from which source
             source_index = len(self.source_files) - 1
             self.cards_by_source[source_index] = new_cards
 
             # Add new cards to the existing collection
             self.current_cards.extend(new_cards)
+            self._refresh_card_labels()
 
             # Update selected cards to include all cards by default
             self.selected_cards = list(range(len(self.current_cards)))
@@ -632,6 +1018,9 @@ Use <strong> for key terms, <code> for formulas, and background colors for risks
 
 def create_interface():
     """Create and return the Gradio interface."""
+    # Imported here so the app class can be used without loading Gradio
+    import gradio as gr
+
     app = AnkiCardCreatorApp()
 
     # Custom CSS for better styling
@@ -703,8 +1092,9 @@ def create_interface():
                 with gr.Tabs():
                     with gr.TabItem("📁 Upload File"):
                         file_input = gr.File(
-                            label="Upload image or PDF file",
+                            label="Upload images or PDF files",
                             file_types=["image", ".pdf"],
+                            file_count="multiple",
                             type="filepath",
                         )
 
@@ -743,8 +1133,8 @@ def create_interface():
 
                 prompt_selector = gr.Dropdown(
                     label="Choose a prepared prompt or create custom",
-                    choices=app.get_prompt_choices(),
-                    value="Custom (Enter your own)",
+                    choices=_PROMPT_CHOICES,
+                    value=_CUSTOM_PROMPT,
                     interactive=True,
                 )
 
@@ -765,6 +1155,9 @@ def create_interface():
                 gr.Markdown(
                     "**Add from latest:** Generates additional cards from the most recently added file only"
                 )
+                gr.Markdown(
+                    "**Regenerate:** Asks for a fresh set from all sources instead of reusing earlier cards"
+                )
 
                 with gr.Row():
                     generate_btn = gr.Button(
@@ -773,6 +1166,7 @@ def create_interface():
                     add_from_latest_btn = gr.Button(
                         "➕ Add from Latest Source", variant="secondary", size="lg"
                     )
+                    regenerate_btn = gr.Button("🔄 Regenerate", variant="secondary", size="lg")
 
             with gr.Column(scale=1):
                 gr.Markdown("### 📋 Generated Cards Preview")
@@ -797,8 +1191,8 @@ def create_interface():
 
                 card_selector = gr.Dropdown(
                     label="Select Card",
-                    choices=["No cards generated"],
-                    value="No cards generated",
+                    choices=[_NO_CARDS_LABEL],
+                    value=_NO_CARDS_LABEL,
                     interactive=True,
                 )
 
@@ -815,7 +1209,7 @@ def create_interface():
                 gr.Markdown("### 👁️ Card Preview")
 
                 card_display = gr.HTML(
-                    value="<div style='text-align: center; padding: 40px; color: #666;'>Generate cards to see them here</div>",
+                    value=_VIEWER_PLACEHOLDER_HTML,
                     label="Card Display",
                 )
 
@@ -832,8 +1226,17 @@ def create_interface():
                     "Choose which cards to include in your Anki deck. If no cards are selected, all cards will be included."
                 )
 
-                card_selection = gr.CheckboxGroup(
-                    label="Cards to Include", choices=[], value=[], interactive=True
+                # A table with an include column instead of one checkbox per card: the
+                # Dataframe only renders the rows in view, which keeps large decks responsive
+                card_selection = gr.Dataframe(
+                    label="Cards to Include",
+                    headers=_SELECTION_HEADERS,
+                    datatype=["bool", "str"],
+                    col_count=(2, "fixed"),
+                    row_count=(0, "fixed"),
+                    type="array",
+                    value=[],
+                    interactive=True,
                 )
 
                 with gr.Row():
@@ -867,22 +1270,58 @@ def create_interface():
         extracted_text_storage = gr.Textbox(visible=False)
 
         # Event handlers - handle file upload, camera, and direct image upload
-        def process_file_or_image(file_path, camera_image, uploaded_image):
-            """Process either file upload, camera capture, or direct image upload."""
-            if file_path is not None:
-                return app.process_file(file_path)
-            elif camera_image is not None:
-                return app.process_file(camera_image)
-            elif uploaded_image is not None:
-                return app.process_file(uploaded_image)
-            else:
+        def process_file_or_image(file_paths, camera_image, uploaded_image, progress=gr.Progress()):
+            """Process either file uploads, camera capture, or direct image upload."""
+            if file_paths:
+                return app.process_files(file_paths, progress)
+
+            # Camera capture takes precedence over a directly uploaded image
+            image = next((img for img in (camera_image, uploaded_image) if img is not None), None)
+            if image is not None:
+                return app.process_file(image, progress)
+
+            return (
+                "❌ Please upload a file, take a photo, or upload an image.",
+                "",
+                "",
+                app.get_sources_summary(),
+            )
+
+        def selection_rows():
+            """Build the selection table rows: one [include, label] row per card."""
+            selected_set = set(app.selected_cards)
+            return [
+                [i in selected_set, label] for i, label in enumerate(app.get_selection_choices())
+            ]
+
+        def viewer_outputs(empty_html=_VIEWER_PLACEHOLDER_HTML):
+            """Build the card viewer and selection outputs from the app's current cards.
+
+            Returns:
+                Tuple of (card_selector, card_display, card_nav_info, flip_btn,
+                card_selection, selection_status) values
+            """
+            if not app.current_cards:
                 return (
-                    "❌ Please upload a file, take a photo, or upload an image.",
-                    "",
-                    "",
-                    app.get_sources_summary(),
+                    gr.update(choices=[_NO_CARDS_LABEL], value=_NO_CARDS_LABEL),
+                    empty_html,
+                    "No cards",
+                    "Show Answer",
+                    [],
+                    "No cards generated yet",
                 )
 
+            card_choices = app.get_card_list()
+            card_html, nav_info, flip_text, current_index, total_cards = app.render_current_card()
+            return (
+                gr.update(choices=card_choices, value=card_choices[current_index]),
+                card_html,
+                nav_info,
+                flip_text,
+                selection_rows(),
+                f"Selected {len(app.selected_cards)} of {total_cards} cards for deck creation",
+            )
+
         def clear_all_sources():
             """Clear all sources and reset the application."""
             status, text, sources = app.clear_all_sources()
@@ -890,91 +1329,48 @@ def create_interface():
                 status,
                 text,
                 sources,
-                gr.Dropdown(choices=["No cards generated"], value="No cards generated"),
-                "<div style='text-align: center; padding: 40px; color: #666;'>Add sources and generate cards to see them here</div>",
-                "No cards",
-                "Show Answer",
-                gr.CheckboxGroup(choices=[], value=[]),
-                "No cards generated yet",
+                *viewer_outputs(_VIEWER_CLEARED_HTML),
             )
 
         def update_prompt_description(prompt_name):
             """Update the learning objective textbox when a prepared prompt is selected."""
-            description = app.get_prompt_description(prompt_name)
-            if prompt_name == "Custom (Enter your own)":
+            if prompt_name == _CUSTOM_PROMPT:
                 return ""
+            return _prompt_description(prompt_name)
+
+        def generate_and_update_viewer(
+            learning_objective,
+            num_cards,
+            progress=gr.Progress(),
+            *,
+            from_latest=False,
+            use_cache=True,
+        ):
+            """Generate cards (from all sources or only the latest one) and update the viewer."""
+            if from_latest:
+                result = app.generate_cards_from_latest_source(
+                    learning_objective, num_cards, progress
+                )
             else:
-                return description
-
-        def generate_cards_and_update_viewer(learning_objective, num_cards):
-            """Generate cards from all sources and update the card viewer."""
-            status, preview, download_info = app.generate_cards(learning_objective, num_cards)
-            return _update_viewer_after_generation((status, preview, download_info))
-
-        def add_cards_from_latest_and_update_viewer(learning_objective, num_cards):
-            """Add cards from latest source and update the card viewer."""
-            status, preview, download_info = app.generate_cards_from_latest_source(
-                learning_objective, num_cards
-            )
-            return _update_viewer_after_generation((status, preview, download_info))
+                result = app.generate_cards(learning_objective, num_cards, progress, use_cache)
+            return _update_viewer_after_generation(result)
 
         def _update_viewer_after_generation(result):
             """Helper function to update the viewer after card generation."""
             status, preview, download_info = result
-
-            # Update card selector dropdown
-            card_choices = app.get_card_list()
-
-            # Update card selection checkboxes
-            if app.current_cards:
-                # Create card selection choices
-                selection_choices = []
-                for i, card in enumerate(app.current_cards):
-                    front_preview = card.get("front", "No question")[:60]
-                    if len(front_preview) >= 60:
-                        front_preview += "..."
-                    # Remove HTML tags for preview
-                    front_clean = re.sub(r"<[^>]+>", "", front_preview)
-                    selection_choices.append(f"Card {i+1}: {front_clean}")
-
-                card_html, nav_info, flip_text, _, _ = app.render_current_card()
-                selection_status = f"Selected {len(app.selected_cards)} of {len(app.current_cards)} cards for deck creation"
-
-                return (
-                    status,  # generation_status
-                    preview,  # cards_preview
-                    download_info,  # deck_status
-                    gr.Dropdown(
-                        choices=card_choices, value=card_choices[0], interactive=True
-                    ),  # card_selector
-                    card_html,  # card_display
-                    nav_info,  # card_nav_info
-                    flip_text,  # flip_btn
-                    gr.CheckboxGroup(
-                        choices=selection_choices, value=selection_choices, interactive=True
-                    ),  # card_selection
-                    selection_status,  # selection_status
-                )
-            else:
-                return (
-                    status,  # generation_status
-                    preview,  # cards_preview
-                    download_info,  # deck_status
-                    gr.Dropdown(
-                        choices=["No cards generated"], value="No cards generated", interactive=True
-                    ),  # card_selector
-                    "<div style='text-align: center; padding: 40px; color: #666;'>Generate cards to see them here</div>",  # card_display
-                    "No cards",  # card_nav_info
-                    "Show Answer",  # flip_btn
-                    gr.CheckboxGroup(choices=[], value=[], interactive=True),  # card_selection
-                    "No cards generated yet",  # selection_status
-                )
+            return (
+                status,  # generation_status
+                preview,  # cards_preview
+                download_info,  # deck_status
+                *viewer_outputs(),  # card viewer and selection components
+            )
 
         # File processing event handlers
         process_btn.click(  # pylint: disable=no-member
             fn=process_file_or_image,
             inputs=[file_input, camera_input, image_input],
             outputs=[extraction_status, extracted_text_storage, text_preview, sources_summary],
+            concurrency_limit=_UPLOAD_CONCURRENCY_LIMIT,
         )
 
         clear_sources_btn.click(  # pylint: disable=no-member
@@ -997,9 +1393,10 @@ def create_interface():
             fn=update_prompt_description, inputs=[prompt_selector], outputs=[learning_objective]
         )
 
-        # Card generation event handlers
+        # Card generation event handlers. All three share one queue slot: they mutate the
+        # same card list, and each refreshes nine outputs with minimal progress UI
         generate_btn.click(  # pylint: disable=no-member
-            fn=generate_cards_and_update_viewer,
+            fn=functools.partial(generate_and_update_viewer, from_latest=False),
             inputs=[learning_objective, num_cards],
             outputs=[
                 generation_status,
@@ -1012,10 +1409,32 @@ def create_interface():
                 card_selection,
                 selection_status,
             ],
+            show_progress="minimal",
+            concurrency_limit=1,
+            concurrency_id="generate_cards",
         )
 
         add_from_latest_btn.click(  # pylint: disable=no-member
-            fn=add_cards_from_latest_and_update_viewer,
+            fn=functools.partial(generate_and_update_viewer, from_latest=True),
+            inputs=[learning_objective, num_cards],
+            outputs=[
+                generation_status,
+                cards_preview,
+                deck_status,
+                card_selector,
+                card_display,
+                card_nav_info,
+                flip_btn,
+                card_selection,
+                selection_status,
+            ],
+            show_progress="minimal",
+            concurrency_limit=1,
+            concurrency_id="generate_cards",
+        )
+
+        regenerate_btn.click(  # pylint: disable=no-member
+            fn=functools.partial(generate_and_update_viewer, use_cache=False),
             inputs=[learning_objective, num_cards],
             outputs=[
                 generation_status,
@@ -1028,68 +1447,64 @@ def create_interface():
                 card_selection,
                 selection_status,
             ],
+            show_progress="minimal",
+            concurrency_limit=1,
+            concurrency_id="generate_cards",
         )
 
         # Card selection event handlers
-        def update_selection(selected_choices):
-            """Update card selection based on checkbox choices."""
+        def update_selection(selection_table):
+            """Update card selection based on the include column of the selection table."""
             if not app.current_cards:
                 return "No cards available to select"
 
-            # Extract indices from selected choices
+            # Map rows to cards by their label, not their position, so edited or
+            # reordered rows can never select the wrong card. Gradio 4 cannot make the label
+            # column read-only, so checked rows with edited labels are reported, not dropped.
             selected_indices = []
-            for choice in selected_choices:
-                try:
-                    # Extract card number from "Card X: ..." format
-                    card_num = int(choice.split(":")[0].replace("Card ", ""))
-                    selected_indices.append(card_num - 1)  # Convert to 0-based index
-                except (ValueError, IndexError):
+            unknown_rows = 0
+            for row in selection_table or []:
+                if len(row) < 2 or not _is_checked(row[0]):
                     continue
-
-            return app.update_card_selection(selected_indices)
+                card_index = app.get_selection_index(row[1])
+                if card_index is None:
+                    unknown_rows += 1
+                elif card_index not in selected_indices:
+                    selected_indices.append(card_index)
+            selected_indices.sort()
+
+            status = app.update_card_selection(selected_indices)
+            if unknown_rows:
+                status += (
+                    f"\n⚠️ Ignored {unknown_rows} checked row(s) whose card label was edited."
+                    " Use Select All to restore the labels."
+                )
+            return status
 
         def select_all_cards():
             """Select all available cards."""
             if not app.current_cards:
-                return gr.CheckboxGroup(choices=[], value=[]), "No cards available"
-
-            # Get all card choices
-            selection_choices = []
-            for i, card in enumerate(app.current_cards):
-                front_preview = card.get("front", "No question")[:60]
-                if len(front_preview) >= 60:
-                    front_preview += "..."
-                # Remove HTML tags for preview
-                front_clean = re.sub(r"<[^>]+>", "", front_preview)
-                selection_choices.append(f"Card {i+1}: {front_clean}")
+                return [], "No cards available"
 
             # Select all cards
             app.selected_cards = list(range(len(app.current_cards)))
             status = app.update_card_selection(app.selected_cards)
 
-            return gr.CheckboxGroup(choices=selection_choices, value=selection_choices), status
+            return selection_rows(), status
 
         def deselect_all_cards():
             """Deselect all cards."""
             if not app.current_cards:
-                return gr.CheckboxGroup(choices=[], value=[]), "No cards available"
-
-            # Get all card choices but select none
-            selection_choices = []
-            for i, card in enumerate(app.current_cards):
-                front_preview = card.get("front", "No question")[:60]
-                if len(front_preview) >= 60:
-                    front_preview += "..."
-                # Remove HTML tags for preview
-                front_clean = re.sub(r"<[^>]+>", "", front_preview)
-                selection_choices.append(f"Card {i+1}: {front_clean}")
+                return [], "No cards available"
 
             # Deselect all cards
             app.selected_cards = []
             status = app.update_card_selection(app.selected_cards)
 
-            return gr.CheckboxGroup(choices=selection_choices, value=[]), status
+            return selection_rows(), status
 
+        # .change() already defaults to trigger_mode="always_last", so toggles made while
+        # an update is running collapse into one follow-up update with the latest table
         card_selection.change(  # pylint: disable=no-member
             fn=update_selection, inputs=[card_selection], outputs=[selection_status]
         )
@@ -1099,12 +1514,40 @@ def create_interface():
         deselect_all_btn.click(fn=deselect_all_cards, outputs=[card_selection, selection_status])  # pylint: disable=no-member
 
         # Card navigation event handlers
+        def changed_nav_outputs(previous_index, flip_text, rendered):
+            """Turn a rendered (card_html, nav_info, flip_text) into updates for what changed.
+
+            The question side of the same card renders identically, so when neither the
+            index nor the flip state moved nothing is sent; an unchanged flip button is
+            always left alone.
+            """
+            card_html, nav_info, new_flip_text = rendered
+            if new_flip_text == flip_text:
+                if app.current_card_index == previous_index:
+                    return gr.update(), gr.update(), gr.update()
+                return card_html, nav_info, gr.update()
+            return card_html, nav_info, new_flip_text
+
+        def navigate_card(direction, flip_text):
+            """Move to the previous or next card."""
+            previous_index = app.current_card_index
+            return changed_nav_outputs(previous_index, flip_text, app.navigate_card(direction))
+
+        def jump_to_card(card_selection, flip_text):
+            """Jump to the card picked in the dropdown."""
+            previous_index = app.current_card_index
+            return changed_nav_outputs(previous_index, flip_text, app.jump_to_card(card_selection))
+
         prev_btn.click(  # pylint: disable=no-member
-            fn=lambda: app.navigate_card("prev"), outputs=[card_display, card_nav_info, flip_btn]
+            fn=functools.partial(navigate_card, "prev"),
+            inputs=[flip_btn],
+            outputs=[card_display, card_nav_info, flip_btn],
         )
 
         next_btn.click(  # pylint: disable=no-member
-            fn=lambda: app.navigate_card("next"), outputs=[card_display, card_nav_info, flip_btn]
+            fn=functools.partial(navigate_card, "next"),
+            inputs=[flip_btn],
+            outputs=[card_display, card_nav_info, flip_btn],
         )
 
         flip_btn.click(  # pylint: disable=no-member
@@ -1112,13 +1555,46 @@ def create_interface():
         )
 
         card_selector.change(  # pylint: disable=no-member
-            fn=app.jump_to_card,
-            inputs=[card_selector],
+            fn=jump_to_card,
+            inputs=[card_selector, flip_btn],
             outputs=[card_display, card_nav_info, flip_btn],
         )
 
+        def create_anki_deck(deck_name, progress=gr.Progress()):
+            """Create the Anki deck with Gradio progress tracking."""
+            return app.create_anki_deck(deck_name, progress)
+
         create_deck_btn.click(  # pylint: disable=no-member
-            fn=app.create_anki_deck, inputs=[deck_name], outputs=[deck_status, download_file]
+            fn=create_anki_deck, inputs=[deck_name], outputs=[deck_status, download_file]
+        )
+
+        def restore_viewer():
+            """Reconnect a (re)loaded page to the sources and cards the app already holds."""
+            if app.current_cards:
+                cards_preview_text = app.card_generator.preview_cards(app.current_cards)
+            else:
+                cards_preview_text = ""
+
+            return (
+                app.get_sources_summary(),  # sources_summary
+                cards_preview_text,  # cards_preview
+                *viewer_outputs(),  # card viewer and selection components
+            )
+
+        # Generated cards live on the app instance, so restore them after a page refresh
+        # instead of showing empty components that would require another LLM call
+        interface.load(  # pylint: disable=no-member
+            fn=restore_viewer,
+            outputs=[
+                sources_summary,
+                cards_preview,
+                card_selector,
+                card_display,
+                card_nav_info,
+                flip_btn,
+                card_selection,
+                selection_status,
+            ],
         )
 
     return interface
@@ -1133,13 +1609,19 @@ def main():
     port_str = os.getenv("PORT", "7860")
     port = int(port_str)
 
-    # Get authentication credentials from environment variables
+    # Get authentication credentials from environment variables, encoded once for comparison
     valid_username = os.getenv("USERNAME")
     valid_password = os.getenv("PASSWORD")
+    credentials_set = valid_username is not None and valid_password is not None
+    valid_username_bytes = (valid_username or "").encode("utf-8")
+    valid_password_bytes = (valid_password or "").encode("utf-8")
 
-    # Simple authentication function for Gradio
+    # Simple authentication function for Gradio, comparing in constant time.
+    # Both fields are always compared so timing does not reveal which one was wrong.
     def authenticate_user(username: str, password: str) -> bool:
-        return username == valid_username and password == valid_password
+        username_ok = hmac.compare_digest(username.encode("utf-8"), valid_username_bytes)
+        password_ok = hmac.compare_digest(password.encode("utf-8"), valid_password_bytes)
+        return credentials_set and username_ok and password_ok
 
     interface.launch(
         server_name=host,
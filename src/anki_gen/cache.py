@@ -0,0 +1,248 @@
+"""
+Caching helpers for expensive Gemini calls.
+
+Text extraction and card generation are network-bound round trips that
+dominate the app's latency and API cost, so repeated requests with the
+same inputs are served from these caches instead.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+# Default location for caches that persist across app restarts
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "anki_gen")
+
+
+def text_digest(text: str) -> str:
+    """Get a stable digest of a text.
+
+    Args:
+        text: Text to hash
+
+    Returns:
+        Hex digest of the UTF-8 encoded text
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def file_digest(file_path: str, chunk_size: int = 1 << 16) -> str:
+    """Get a digest of a file's contents, reading it in fixed-size chunks.
+
+    Args:
+        file_path: Path to the file
+        chunk_size: Number of bytes read per chunk
+
+    Returns:
+        Hex digest of the file bytes
+    """
+    h = hashlib.blake2b(digest_size=16)
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(file_path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            h.update(view[:n])
+    return h.hexdigest()
+
+
+def image_digest(image: Image.Image) -> str:
+    """Get a digest of an image's pixel data.
+
+    Args:
+        image: PIL Image object
+
+    Returns:
+        Hex digest of the pixel data, mode and size
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{image.mode}:{image.size[0]}x{image.size[1]}:".encode("ascii"))
+    h.update(memoryview(image.tobytes()))
+    return h.hexdigest()
+
+
+def normalize_objective(learning_objective: str) -> str:
+    """Normalize a learning objective so trivially reworded inputs share a cache key.
+
+    Args:
+        learning_objective: Objective as entered by the user
+
+    Returns:
+        Case-folded objective with collapsed whitespace
+    """
+    return " ".join(learning_objective.casefold().split())
+
+
+class GenerationCache:
+    """LRU cache of generated study cards, optionally backed by a persistent DiskCache."""
+
+    def __init__(
+        self,
+        max_entries: int = 128,
+        disk_cache: Optional["DiskCache"] = None,
+        version: str = "",
+    ):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of generation results to keep in memory
+            disk_cache: Optional persistent cache consulted on in-memory misses
+            version: Model and prompt version mixed into persisted keys, so results
+                generated under another model or prompt are never served
+        """
+        self.max_entries = max_entries
+        self.disk_cache = disk_cache
+        self.version = version
+        self._entries: "OrderedDict[Tuple[str, str, int], List[Dict[str, str]]]" = OrderedDict()
+
+    @staticmethod
+    def _key(text: str, learning_objective: str, num_cards: int) -> Tuple[str, str, int]:
+        return text_digest(text), normalize_objective(learning_objective), int(num_cards)
+
+    def _disk_key(self, key: Tuple[str, str, int]) -> str:
+        sources_hash, objective, num_cards = key
+        return hashlib.blake2b(
+            f"{self.version}\0{sources_hash}\0{objective}\0{num_cards}".encode("utf-8"),
+            digest_size=16,
+        ).hexdigest()
+
+    def _remember(self, key: Tuple[str, str, int], cards: List[Dict[str, str]]) -> None:
+        self._entries[key] = cards
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(
+        self, text: str, learning_objective: str, num_cards: int
+    ) -> Optional[List[Dict[str, str]]]:
+        """Look up cards previously generated for the same inputs.
+
+        Args:
+            text: Source text the cards were generated from
+            learning_objective: What the user wants to learn
+            num_cards: Number of cards requested
+
+        Returns:
+            A copy of the cached cards, or None on a miss
+        """
+        key = self._key(text, learning_objective, num_cards)
+        cards = self._entries.get(key)
+        if cards is not None:
+            self._entries.move_to_end(key)
+            return list(cards)
+
+        if self.disk_cache is None:
+            return None
+
+        cards = self.disk_cache.get(self._disk_key(key))
+        if not isinstance(cards, list):
+            return None
+
+        self._remember(key, cards)
+        return list(cards)
+
+    def set(
+        self, text: str, learning_objective: str, num_cards: int, cards: List[Dict[str, str]]
+    ) -> None:
+        """Store generated cards for the given inputs.
+
+        Args:
+            text: Source text the cards were generated from
+            learning_objective: What the user wants to learn
+            num_cards: Number of cards requested
+            cards: Generated card dictionaries
+        """
+        key = self._key(text, learning_objective, num_cards)
+        self._remember(key, list(cards))
+
+        if self.disk_cache is not None:
+            self.disk_cache.set(self._disk_key(key), list(cards))
+
+    def clear(self) -> None:
+        """Forget all cached generation results, in memory and on disk."""
+        self._entries.clear()
+
+        if self.disk_cache is not None:
+            self.disk_cache.clear()
+
+
+class DiskCache:
+    """Persistent key-value cache storing one JSON file per key."""
+
+    def __init__(self, directory: str, ttl_seconds: Optional[float] = None):
+        """Initialize the cache.
+
+        Args:
+            directory: Directory holding the cache entries, created on first write
+            ttl_seconds: Maximum age of an entry, or None to keep entries forever
+        """
+        self.directory = os.path.expanduser(directory)
+        self.ttl_seconds = ttl_seconds
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Read a cached value.
+
+        Args:
+            key: Cache key (a hex digest)
+
+        Returns:
+            The cached value, or None if missing, expired or unreadable
+        """
+        path = self._path(key)
+        try:
+            if self.ttl_seconds is not None:
+                if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                    os.remove(path)
+                    return None
+
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value, ignoring failures so caching never breaks the caller.
+
+        Args:
+            key: Cache key (a hex digest)
+            value: JSON-serializable value
+        """
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Write to a temporary file first so readers never see partial entries
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(value, f, ensure_ascii=False)
+                os.replace(temp_path, self._path(key))
+            except BaseException:
+                os.remove(temp_path)
+                raise
+        except (OSError, TypeError, ValueError):
+            pass
+
+    def clear(self) -> None:
+        """Remove all entries, ignoring failures so clearing never breaks the caller."""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+
+        for name in names:
+            if name.endswith(".json"):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
@@ -1,235 +1,385 @@
+import contextlib
+import functools
+import itertools
 import random
 import tempfile
 import os
+import pathlib
 import zipfile
 import sqlite3
 import json
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Iterable, Iterator, List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import genanki
 
+from anki_gen.html_utils import strip_html_batch
+
+try:
+    import orjson
+except ImportError:  # Optional faster JSON encoder
+    orjson = None
+
+# Number of imported notes whose fields are cleaned together
+_CLEAN_BATCH_SIZE = 1000
+
+# Bytes of an imported Anki collection to memory-map while reading it, and the
+# SQLite page cache for the note scan (negative values are in KiB)
+_SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+_SQLITE_CACHE_SIZE = -64000
+
+# Fixed ID of the "AI Study Card" note type. Anki identifies note types by ID, so a
+# stable value lets decks exported in different runs share (and merge into) one type.
+_NOTE_TYPE_ID = 1_607_392_319
+
+# Question and answer templates of the "AI Study Card" note type
+_CARD_QFMT = """
+<div class="card-front">
+    <div class="question">{{Front}}</div>
+    <div class="source">Source: {{Source}}</div>
+</div>
+"""
+_CARD_AFMT = """
+<div class="card-back">
+    <div class="question">{{Front}}</div>
+    <hr>
+    <div class="answer">{{Back}}</div>
+    <div class="metadata">
+        <div class="source">Source: {{Source}}</div>
+        <div class="created">Created: {{Created}}</div>
+    </div>
+</div>
+"""
+
+# Styling of the "AI Study Card" note type
+_CARD_CSS = """
+.card {
+    font-family: "Arial", sans-serif;
+    font-size: 16px;
+    line-height: 1.5;
+    color: #000000;
+    background-color: #fafafa;
+    padding: 20px;
+    border-radius: 8px;
+    max-width: 600px;
+    margin: 0 auto;
+}
+
+/* Keep all card text black; rules below only set what differs */
+.card * {
+    color: #000000;
+}
+
+.card-front, .card-back {
+    text-align: center;
+}
+
+.question {
+    font-size: 18px;
+    font-weight: bold;
+    margin-bottom: 20px;
+    background-color: #ecf0f1;
+    padding: 15px;
+    border-radius: 5px;
+    border-left: 4px solid #3498db;
+}
+
+.answer {
+    font-size: 16px;
+    margin: 20px 0;
+    padding: 15px;
+    background-color: #e8f5e8;
+    border-radius: 5px;
+    border-left: 4px solid #27ae60;
+    text-align: left;
+}
+
+.source {
+    font-size: 12px;
+    font-style: italic;
+    margin-top: 10px;
+}
+
+.metadata {
+    margin-top: 20px;
+    padding-top: 15px;
+    border-top: 1px solid #bdc3c7;
+    font-size: 11px;
+}
+
+.created {
+    margin-top: 5px;
+}
+
+hr {
+    border: none;
+    border-top: 2px solid #ecf0f1;
+    margin: 20px 0;
+}
+
+/* Enhanced formatting for structured content */
+strong, b {
+    font-weight: bold;
+}
+
+em, i {
+    font-style: italic;
+}
+
+.highlight {
+    background-color: #fff3cd;
+    border: 1px solid #ffeaa7;
+    border-radius: 4px;
+    padding: 8px;
+    margin: 5px 0;
+}
+
+ul, ol {
+    margin: 10px 0;
+    padding-left: 20px;
+    text-align: left;
+}
+
+li {
+    margin: 5px 0;
+    line-height: 1.4;
+}
+
+code {
+    background-color: #f8f9fa;
+    border: 1px solid #e9ecef;
+    border-radius: 3px;
+    padding: 2px 6px;
+    font-family: "Monaco", "Consolas", monospace;
+    font-size: 14px;
+}
+
+blockquote {
+    border-left: 4px solid #6c757d;
+    margin: 10px 0;
+    padding: 10px 15px;
+    background-color: #f8f9fa;
+    font-style: italic;
+}
+
+/* Color classes for different types of information */
+.definition {
+    font-weight: bold;
+}
+
+.example {
+    font-style: italic;
+}
+
+.warning {
+    font-weight: bold;
+    background-color: #ffe6e6;
+    padding: 2px 4px;
+    border-radius: 3px;
+}
+
+.note {
+    font-size: 14px;
+}
+
+.pronunciation {
+    font-style: italic;
+    font-size: 14px;
+}
+
+/* Responsive design */
+@media (max-width: 600px) {
+    .card {
+        padding: 15px;
+        font-size: 14px;
+    }
+    
+    .question {
+        font-size: 16px;
+    }
+    
+    .answer {
+        font-size: 14px;
+    }
+    
+    ul, ol {
+        padding-left: 15px;
+    }
+}
+"""
+
+
+def _dump_json(value: Any) -> bytes:
+    """Serialize a value to compact UTF-8 JSON, with orjson's native encoder when installed.
+
+    Args:
+        value: JSON-serializable value
+
+    Returns:
+        Encoded JSON document
+    """
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+@functools.lru_cache(maxsize=100_000)
+def _guid_for(front: str, back: str) -> str:
+    """Get the note GUID for a card, memoized so re-exported cards are not re-hashed.
+
+    Args:
+        front: Front of the card
+        back: Back of the card
+
+    Returns:
+        genanki GUID derived from the card content
+    """
+    return genanki.guid_for(front, back)
+
+
+def _clean_html_batch(texts: List[str]) -> List[str]:
+    """Clean several card fields with one tag-removal pass and one entity-decoding pass.
+
+    Args:
+        texts: Fields potentially containing HTML tags and entities
+
+    Returns:
+        Cleaned fields, in the same order
+    """
+    # Non-breaking spaces (from &nbsp;) are kept as plain spaces
+    return [text.replace("\xa0", " ").strip() for text in strip_html_batch(texts)]
+
+
+def _front_and_back(fields_blob: bytes) -> Optional[Tuple[str, str]]:
+    """Decode the first two fields of a note read with CAST(flds AS BLOB).
+
+    Only these two fields are split off and decoded; any further fields are left as is.
+
+    Args:
+        fields_blob: UTF-8 note fields separated by the field separator (ASCII 31)
+
+    Returns:
+        Tuple of (front, back), or None if the note has fewer than two fields
+    """
+    fields = fields_blob.split(b"\x1f", 2)
+    if len(fields) < 2:
+        return None
+    return fields[0].decode("utf-8"), fields[1].decode("utf-8")
+
+
+def _has_text(value: Any) -> bool:
+    """Check whether a card side holds any non-whitespace text.
+
+    Args:
+        value: Card side, usually a string
+
+    Returns:
+        True if the side is set and not whitespace only
+    """
+    if not value:
+        return False
+    text = str(value)
+    return bool(text) and not text.isspace()
+
+
+def _is_valid_card(card: Any) -> bool:
+    """Check whether a card is a dictionary with a non-empty front and back.
+
+    Args:
+        card: Card to check
+
+    Returns:
+        True if the card can be added to a deck as is
+    """
+    return isinstance(card, dict) and _has_text(card.get("front")) and _has_text(card.get("back"))
+
+
+@contextlib.contextmanager
+def _open_packaged_db(zip_file: zipfile.ZipFile, member: str) -> Iterator[sqlite3.Connection]:
+    """Open an SQLite database stored in an .apkg archive without extracting the archive.
+
+    Args:
+        zip_file: Open .apkg archive
+        member: Name of the database entry in the archive
+
+    Yields:
+        Connection to the database, closed when the context exits
+    """
+    db_bytes = zip_file.read(member)
+
+    # Python 3.11+ can load the database straight from memory
+    if hasattr(sqlite3.Connection, "deserialize"):
+        conn = sqlite3.connect(":memory:")
+        try:
+            conn.deserialize(db_bytes)
+            yield conn
+        finally:
+            conn.close()
+        return
+
+    # Otherwise write just this entry to a temporary file and open it read-only
+    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as db_file:
+        db_file.write(db_bytes)
+    try:
+        conn = sqlite3.connect(pathlib.Path(db_file.name).as_uri() + "?mode=ro", uri=True)
+        try:
+            yield conn
+        finally:
+            conn.close()
+    finally:
+        os.remove(db_file.name)
+
 
 class AnkiCardGenerator:
     """Generate Anki-compatible flashcard decks from study card data."""
 
+    # Shared note type, built on first use by _get_note_type
+    _note_type: Optional[genanki.Model] = None
+
     def __init__(self):
         """Initialize the Anki card generator with a custom note type."""
-        # Create a custom note type for our study cards
-        self.note_type = genanki.Model(
-            random.randrange(1 << 30, 1 << 31),  # Random model ID
-            "AI Study Card",
-            fields=[
-                {"name": "Front"},
-                {"name": "Back"},
-                {"name": "Source"},
-                {"name": "Created"},
-            ],
-            templates=[
-                {
-                    "name": "Card 1",
-                    "qfmt": """
-                    <div class="card-front">
-                        <div class="question">{{Front}}</div>
-                        <div class="source">Source: {{Source}}</div>
-                    </div>
-                    """,
-                    "afmt": """
-                    <div class="card-back">
-                        <div class="question">{{Front}}</div>
-                        <hr>
-                        <div class="answer">{{Back}}</div>
-                        <div class="metadata">
-                            <div class="source">Source: {{Source}}</div>
-                            <div class="created">Created: {{Created}}</div>
-                        </div>
-                    </div>
-                    """,
-                },
-            ],
-            css="""
-            .card {
-                font-family: "Arial", sans-serif;
-                font-size: 16px;
-                line-height: 1.5;
-                color: #000000;
-                background-color: #fafafa;
-                padding: 20px;
-                border-radius: 8px;
-                max-width: 600px;
-                margin: 0 auto;
-            }
-            
-            .card-front, .card-back {
-                text-align: center;
-            }
-            
-            .question {
-                font-size: 18px;
-                font-weight: bold;
-                margin-bottom: 20px;
-                color: #000000;
-                background-color: #ecf0f1;
-                padding: 15px;
-                border-radius: 5px;
-                border-left: 4px solid #3498db;
-            }
-            
-            .answer {
-                font-size: 16px;
-                margin: 20px 0;
-                padding: 15px;
-                background-color: #e8f5e8;
-                border-radius: 5px;
-                border-left: 4px solid #27ae60;
-                text-align: left;
-                color: #000000;
-            }
-            
-            .source {
-                font-size: 12px;
-                color: #000000;
-                font-style: italic;
-                margin-top: 10px;
-            }
-            
-            .metadata {
-                margin-top: 20px;
-                padding-top: 15px;
-                border-top: 1px solid #bdc3c7;
-                font-size: 11px;
-                color: #000000;
-            }
-            
-            .created {
-                margin-top: 5px;
-            }
-            
-            hr {
-                border: none;
-                border-top: 2px solid #ecf0f1;
-                margin: 20px 0;
-            }
-            
-            /* Enhanced formatting for structured content */
-            strong, b {
-                color: #000000;
-                font-weight: bold;
-            }
-            
-            em, i {
-                color: #000000;
-                font-style: italic;
-            }
-            
-            .highlight {
-                background-color: #fff3cd;
-                border: 1px solid #ffeaa7;
-                border-radius: 4px;
-                padding: 8px;
-                margin: 5px 0;
-                color: #000000;
-            }
-            
-            ul, ol {
-                margin: 10px 0;
-                padding-left: 20px;
-                text-align: left;
-                color: #000000;
-            }
-            
-            li {
-                margin: 5px 0;
-                line-height: 1.4;
-                color: #000000;
-            }
-            
-            code {
-                background-color: #f8f9fa;
-                border: 1px solid #e9ecef;
-                border-radius: 3px;
-                padding: 2px 6px;
-                font-family: "Monaco", "Consolas", monospace;
-                font-size: 14px;
-                color: #000000;
-            }
-            
-            blockquote {
-                border-left: 4px solid #6c757d;
-                margin: 10px 0;
-                padding: 10px 15px;
-                background-color: #f8f9fa;
-                font-style: italic;
-                color: #000000;
-            }
-            
-            /* Color classes for different types of information */
-            .definition {
-                color: #000000;
-                font-weight: bold;
-            }
-            
-            .example {
-                color: #000000;
-                font-style: italic;
-            }
-            
-            .warning {
-                color: #000000;
-                font-weight: bold;
-                background-color: #ffe6e6;
-                padding: 2px 4px;
-                border-radius: 3px;
-            }
-            
-            .note {
-                color: #000000;
-                font-size: 14px;
-            }
-            
-            .pronunciation {
-                color: #000000;
-                font-style: italic;
-                font-size: 14px;
-            }
-            
-            /* Responsive design */
-            @media (max-width: 600px) {
-                .card {
-                    padding: 15px;
-                    font-size: 14px;
-                }
-                
-                .question {
-                    font-size: 16px;
-                }
-                
-                .answer {
-                    font-size: 14px;
-                }
-                
-                ul, ol {
-                    padding-left: 15px;
-                }
-            }
-            """,
-        )
+        self.note_type = self._get_note_type()
+
+    @classmethod
+    def _get_note_type(cls) -> genanki.Model:
+        """Get the custom note type for our study cards, building it once per process.
+
+        Returns:
+            The shared genanki Model
+        """
+        if cls._note_type is None:
+            cls._note_type = genanki.Model(
+                _NOTE_TYPE_ID,
+                "AI Study Card",
+                fields=[
+                    {"name": "Front"},
+                    {"name": "Back"},
+                    {"name": "Source"},
+                    {"name": "Created"},
+                ],
+                templates=[
+                    {
+                        "name": "Card 1",
+                        "qfmt": _CARD_QFMT,
+                        "afmt": _CARD_AFMT,
+                    },
+                ],
+                css=_CARD_CSS,
+            )
+        return cls._note_type
 
     def create_deck(
-        self, cards: List[Dict[str, str]], deck_name: str, source_info: str = "AI Generated"
+        self, cards: Iterable[Dict[str, str]], deck_name: str, source_info: str = "AI Generated"
     ) -> str:
         """Create an Anki deck (.apkg file) from study cards.
 
         Args:
-            cards: List of dictionaries with 'front' and 'back' keys
+            cards: Dictionaries with 'front' and 'back' keys, consumed in a single pass
             deck_name: Name for the Anki deck
             source_info: Information about the source material
 
         Returns:
             Path to the created .apkg file
         """
-        if not cards:
-            raise ValueError("No cards provided to create deck")
-
         # Create the deck
         deck_id = random.randrange(1 << 30, 1 << 31)
         deck = genanki.Deck(deck_id, deck_name)
@@ -237,17 +387,27 @@ class AnkiCardGenerator:
         # Get current timestamp
         created_time = datetime.now().strftime("%Y-%m-%d %H:%M")
 
-        # Add cards to the deck
+        # Build all notes first, then add them to the deck in one step
+        note_type = self.note_type
+        notes = []
         for i, card_data in enumerate(cards, 1):
-            front = card_data.get("front", f"Question {i}")
-            back = card_data.get("back", f"Answer {i}")
+            # Placeholders are only formatted when a side is missing or empty
+            front = card_data.get("front") or f"Question {i}"
+            back = card_data.get("back") or f"Answer {i}"
 
-            # Create note
+            # Create note. Its GUID comes from the card content alone (not the creation
+            # time), so re-importing an exported card updates it instead of duplicating it.
             note = genanki.Note(
-                model=self.note_type, fields=[front, back, source_info, created_time]
+                model=note_type,
+                fields=[front, back, source_info, created_time],
+                guid=_guid_for(front, back),
             )
+            notes.append(note)
 
-            deck.add_note(note)
+        if not notes:
+            raise ValueError("No cards provided to create deck")
+
+        deck.notes.extend(notes)
 
         # Create temporary file for the deck
         temp_dir = tempfile.gettempdir()
@@ -272,6 +432,17 @@ class AnkiCardGenerator:
         if not cards:
             return {"valid": False, "error": "No cards provided", "total_cards": 0}
 
+        # Fast path: error messages are only built when some card is invalid
+        valid_cards = sum(1 for card in cards if _is_valid_card(card))
+        if valid_cards == len(cards):
+            return {
+                "valid": True,
+                "total_cards": len(cards),
+                "valid_cards": valid_cards,
+                "invalid_cards": 0,
+                "errors": [],
+            }
+
         valid_cards = 0
         invalid_cards = []
 
@@ -280,11 +451,11 @@ class AnkiCardGenerator:
                 invalid_cards.append(f"Card {i+1}: Not a dictionary")
                 continue
 
-            if not card.get("front") or not str(card.get("front")).strip():
+            if not _has_text(card.get("front")):
                 invalid_cards.append(f"Card {i+1}: Missing or empty front")
                 continue
 
-            if not card.get("back") or not str(card.get("back")).strip():
+            if not _has_text(card.get("back")):
                 invalid_cards.append(f"Card {i+1}: Missing or empty back")
                 continue
 
@@ -311,20 +482,22 @@ class AnkiCardGenerator:
         if not cards:
             return "No cards to preview."
 
-        preview_text = f"Preview of {min(len(cards), max_preview)} cards (Total: {len(cards)}):\n\n"
+        parts = [f"Preview of {min(len(cards), max_preview)} cards (Total: {len(cards)}):\n\n"]
 
-        for i, card in enumerate(cards[:max_preview]):
+        for i, card in enumerate(itertools.islice(cards, max_preview), 1):
             front = card.get("front", "No question")
             back = card.get("back", "No answer")
 
-            preview_text += f"--- Card {i+1} ---\n"
-            preview_text += f"Q: {front[:100]}{'...' if len(front) > 100 else ''}\n"
-            preview_text += f"A: {back[:100]}{'...' if len(back) > 100 else ''}\n\n"
+            parts.append(
+                f"--- Card {i} ---\n"
+                f"Q: {front[:100]}{'...' if len(front) > 100 else ''}\n"
+                f"A: {back[:100]}{'...' if len(back) > 100 else ''}\n\n"
+            )
 
         if len(cards) > max_preview:
-            preview_text += f"... and {len(cards) - max_preview} more cards"
+            parts.append(f"... and {len(cards) - max_preview} more cards")
 
-        return preview_text
+        return "".join(parts)
 
     def read_deck(self, file_path: str) -> Tuple[str, List[Dict[str, str]]]:
         """Read an Anki deck (.apkg file) and extract cards.
@@ -338,33 +511,24 @@ class AnkiCardGenerator:
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"Deck file not found: {file_path}")
 
-        # Extract the .apkg file (which is a zip file)
+        # Read only the SQLite database from the .apkg file (which is a zip file);
+        # media entries are never extracted
         with zipfile.ZipFile(file_path, "r") as zip_ref:
-            zip_ref.extractall(tempfile.gettempdir())
-            extracted_files = zip_ref.namelist()
-
-        # Find the SQLite database file in the extracted files
-        db_file = next((f for f in extracted_files if f.endswith(".db")), None)
-        if not db_file:
-            raise ValueError("No database file found in the deck package")
-
-        # Connect to the SQLite database and read the cards
-        conn = sqlite3.connect(os.path.join(tempfile.gettempdir(), db_file))
-        cursor = conn.cursor()
+            db_file = next((f for f in zip_ref.namelist() if f.endswith(".db")), None)
+            if not db_file:
+                raise ValueError("No database file found in the deck package")
 
-        # Query the notes table to get the card data
-        cursor.execute("SELECT flds FROM notes")
-        rows = cursor.fetchall()
-
-        # Close the database connection
-        conn.close()
+            # Query the notes table to get the card data
+            with _open_packaged_db(zip_ref, db_file) as conn:
+                rows = conn.execute("SELECT CAST(flds AS BLOB) FROM notes").fetchall()
 
         # Extract the front and back fields from the card data
         cards = []
         for row in rows:
-            fields = row[0].split("\x1f")  # Fields are separated by a special character
-            if len(fields) >= 2:
-                cards.append({"front": fields[0], "back": fields[1]})
+            front_and_back = _front_and_back(row[0])
+            if front_and_back is not None:
+                front, back = front_and_back
+                cards.append({"front": front, "back": back})
 
         # Get the deck name (usually the first part of the .apkg file name)
         deck_name = os.path.basename(file_path).split(".")[0]
@@ -383,16 +547,18 @@ class AnkiCardGenerator:
         """
         deck_name, cards = self.read_deck(file_path)
 
-        # Prepare the output JSON data
-        output_data = {"deck_name": deck_name, "cards": cards}
-
         # Determine the output file path
         if output_path is None:
             output_path = os.path.splitext(file_path)[0] + ".json"
 
-        # Write the data to the JSON file
-        with open(output_path, "w", encoding="utf-8") as json_file:
-            json.dump(output_data, json_file, ensure_ascii=False, indent=4)
+        # Stream the {"deck_name": ..., "cards": [...]} document one card per line, so the
+        # whole deck is never serialized into a single string
+        with open(output_path, "wb") as json_file:
+            json_file.write(b'{\n  "deck_name": ' + _dump_json(deck_name) + b',\n  "cards": [')
+            for i, card in enumerate(cards):
+                json_file.write(b",\n    " if i else b"\n    ")
+                json_file.write(_dump_json(card))
+            json_file.write(b"\n  ]\n}\n" if cards else b"]\n}\n")
 
         return output_path
 
@@ -418,12 +584,14 @@ class AnkiCardGenerator:
         return deck_name, cards
 
     def parse_existing_deck(
-        self, apkg_file_path: str
+        self, apkg_file_path: str, parse_models: bool = False
     ) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
         """Parse an existing Anki deck (.apkg file) and extract cards.
 
         Args:
             apkg_file_path: Path to the .apkg file
+            parse_models: Whether to parse the deck's note types into
+                deck_metadata["model_info"]; left empty otherwise
 
         Returns:
             Tuple of (cards_list, deck_metadata)
@@ -432,75 +600,78 @@ class AnkiCardGenerator:
         deck_metadata = {"name": "", "description": "", "model_info": {}}
 
         try:
-            # Create temporary directory to extract the .apkg file
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # Extract the .apkg (zip) file
-                with zipfile.ZipFile(apkg_file_path, "r") as zip_file:
-                    zip_file.extractall(temp_dir)
-
-                # Look for the collection.anki2 database
-                db_path = os.path.join(temp_dir, "collection.anki2")
-                if not os.path.exists(db_path):
+            # Read only the collection database from the .apkg (zip) file; media
+            # entries are never extracted
+            with zipfile.ZipFile(apkg_file_path, "r") as zip_file:
+                if "collection.anki2" not in zip_file.namelist():
                     raise ValueError("Invalid Anki deck file: missing collection.anki2")
 
-                # Connect to the SQLite database
-                conn = sqlite3.connect(db_path)
-                cursor = conn.cursor()
-
-                # Get deck information
-                cursor.execute("SELECT decks FROM col")
-                deck_data = cursor.fetchone()
-                if deck_data:
-                    decks_json = json.loads(deck_data[0])
-                    # Get the first deck (usually the only one in a single deck export)
-                    for deck_id, deck_info in decks_json.items():
-                        if deck_id != "1":  # Skip the default deck
-                            deck_metadata["name"] = deck_info.get("name", "")
-                            deck_metadata["description"] = deck_info.get("desc", "")
-                            break
+                with _open_packaged_db(zip_file, "collection.anki2") as conn:
+                    # The collection is only read, so memory-map it (when it is backed
+                    # by a file), give the scan a larger page cache and keep temporary
+                    # structures in memory
+                    conn.execute("PRAGMA query_only = 1")
+                    conn.execute("PRAGMA temp_store = MEMORY")
+                    conn.execute(f"PRAGMA mmap_size = {_SQLITE_MMAP_SIZE}")
+                    conn.execute(f"PRAGMA cache_size = {_SQLITE_CACHE_SIZE}")
+                    cursor = conn.cursor()
+
+                    # Get deck information, and model information for field mapping
+                    # only when asked for, since the models JSON is large
+                    columns = "decks, models" if parse_models else "decks"
+                    cursor.execute(f"SELECT {columns} FROM col")
+                    col_data = cursor.fetchone()
+                    if col_data:
+                        decks_json = json.loads(col_data[0])
+                        # Get the first deck (usually the only one in a single deck export)
+                        for deck_id, deck_info in decks_json.items():
+                            if deck_id != "1":  # Skip the default deck
+                                deck_metadata["name"] = deck_info.get("name", "")
+                                deck_metadata["description"] = deck_info.get("desc", "")
+                                break
+
+                        if parse_models:
+                            deck_metadata["model_info"] = json.loads(col_data[1])
+
+                    # Get cards and notes
+                    cursor.execute(
+                        """
+                        SELECT CAST(n.flds AS BLOB), n.tags, c.type 
+                        FROM notes n 
+                        JOIN cards c ON c.nid = n.id 
+                        WHERE c.did != 1
+                    """
+                    )
 
-                # Get model information for field mapping
-                cursor.execute("SELECT models FROM col")
-                models_data = cursor.fetchone()
-                if models_data:
-                    models_json = json.loads(models_data[0])
-                    deck_metadata["model_info"] = models_json
+                    # Stream rows from the cursor in batches instead of materializing them all
+                    while True:
+                        rows = cursor.fetchmany(_CLEAN_BATCH_SIZE)
+                        if not rows:
+                            break
 
-                # Get cards and notes
-                cursor.execute(
-                    """
-                    SELECT n.flds, n.tags, c.type 
-                    FROM notes n 
-                    JOIN cards c ON c.nid = n.id 
-                    WHERE c.did != 1
-                """
-                )
-
-                note_rows = cursor.fetchall()
-
-                for fields_str, tags, card_type in note_rows:
-                    # Split fields by the field separator (ASCII 31)
-                    fields = fields_str.split("\x1f")
-
-                    # Map fields to front/back based on common patterns
-                    if len(fields) >= 2:
-                        front = fields[0].strip()
-                        back = fields[1].strip()
-
-                        # Clean HTML tags for preview (basic cleaning)
-                        front = self._clean_html(front)
-                        back = self._clean_html(back)
-
-                        if front and back:  # Only add if both front and back exist
-                            card = {
-                                "front": front,
-                                "back": back,
-                                "tags": tags,
-                                "card_type": card_type,
-                            }
-                            cards.append(card)
-
-                conn.close()
+                        # Map the first two fields to front/back based on common patterns
+                        notes = []
+                        for fields_blob, tags, card_type in rows:
+                            front_and_back = _front_and_back(fields_blob)
+                            if front_and_back is not None:
+                                notes.append((*front_and_back, tags, card_type))
+
+                        # Clean HTML tags for preview (basic cleaning), the whole batch at once
+                        cleaned = _clean_html_batch(
+                            [side for front, back, _, _ in notes for side in (front, back)]
+                        )
+
+                        for (_, _, tags, card_type), front, back in zip(
+                            notes, cleaned[::2], cleaned[1::2]
+                        ):
+                            if front and back:  # Only add if both front and back exist
+                                card = {
+                                    "front": front,
+                                    "back": back,
+                                    "tags": tags,
+                                    "card_type": card_type,
+                                }
+                                cards.append(card)
 
         except Exception as e:
             raise Exception(f"Error parsing Anki deck: {str(e)}")
@@ -516,16 +687,7 @@ class AnkiCardGenerator:
         Returns:
             Cleaned text
         """
-        import re
-
-        # Remove HTML tags
-        clean_text = re.sub(r"<[^>]+>", "", text)
-        # Replace HTML entities
-        clean_text = clean_text.replace("&nbsp;", " ")
-        clean_text = clean_text.replace("&lt;", "<")
-        clean_text = clean_text.replace("&gt;", ">")
-        clean_text = clean_text.replace("&amp;", "&")
-        return clean_text.strip()
+        return _clean_html_batch([text])[0]
 
     def extend_deck(
         self,
@@ -548,8 +710,8 @@ class AnkiCardGenerator:
         if not new_cards and not existing_cards:
             raise ValueError("No cards provided to create deck")
 
-        # Combine all cards
-        all_cards = existing_cards + new_cards
+        # Chain both lists so no combined copy is built
+        all_cards = itertools.chain(existing_cards, new_cards)
 
         # Create the deck using the existing create_deck method
         return self.create_deck(all_cards, deck_name, source_info)
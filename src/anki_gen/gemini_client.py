@@ -1,8 +1,122 @@
+import asyncio
 import os
-from typing import Optional, List, Dict, Union
+import re
+import threading
+from typing import Optional, List, Dict, Tuple, Union
 from PIL import Image
 import google.generativeai as genai
 
+# Matches one "FRONT: ... BACK: ..." card in a generation response. Each side may span
+# several lines, but neither runs past the next "CARD " header or FRONT:, so a card
+# missing its BACK is dropped instead of swallowing the following card.
+_CARD_RE = re.compile(
+    r"^[ \t]*FRONT:((?:(?!^[ \t]*(?:CARD |FRONT:)).)*?)"
+    r"^[ \t]*BACK:(.*?)(?=^[ \t]*(?:CARD |FRONT:)|\Z)",
+    re.DOTALL | re.MULTILINE,
+)
+
+# Maximum number of Gemini requests the async batch helpers keep in flight
+_MAX_CONCURRENT_REQUESTS = 8
+
+# Models shared by all clients, keyed on (api_key, model_name, system_instruction), so
+# they are built once per key instead of once per client. A model binds the configured
+# client on first use, so models for different keys must never be shared
+_model_cache: Dict[Tuple[str, str, Optional[str]], genai.GenerativeModel] = {}
+_model_cache_lock = threading.Lock()
+
+# Static card-writing guidance, sent once as the card model's system instruction
+# rather than repeated in every generation prompt. Changing it or the generation prompt
+# must bump _CARD_PROMPT_VERSION in app.py so stale cached generations are dropped
+_CARD_SYSTEM_INSTRUCTION = """You create study cards suitable for spaced repetition learning (like Anki flashcards).
+
+INSTRUCTIONS:
+1. Each card should have a clear, concise FRONT (question/prompt) and BACK (answer/explanation)
+2. Focus on the most important information related to the learning objective
+3. Make questions specific and testable
+4. Include context when necessary for clarity
+5. Vary question types (definitions, examples, applications, etc.)
+6. Use HTML formatting to make the cards more readable and well-structured
+
+HTML FORMATTING GUIDELINES:
+- Use <strong> or <b> for important terms, keywords, and emphasis
+- Use <em> or <i> for foreign words, scientific names, or subtle emphasis
+- Use <br> for line breaks when needed
+- Use <ul> and <li> for bullet points when listing multiple items
+- Use <ol> and <li> for numbered lists when showing steps or rankings
+- Use <div class="highlight"> for key concepts that need special attention
+- Use <span style="background-color: #ffe6e6; padding: 2px 4px; border-radius: 3px;"> for critical information or warnings
+- Use <span style="background-color: #e6f3e6; padding: 2px 4px; border-radius: 3px;"> for positive examples or correct answers
+- Use <code> for formulas, equations, or technical terms
+- Use <blockquote> for quotes or important excerpts
+- For definitions: Use <strong> for the term being defined
+- For examples: Use <em>Example:</em> to introduce examples
+- For pronunciation: Use <span style="font-style: italic;">pronunciation guide</span>
+- Always ensure text remains BLACK (#000000) for maximum readability
+
+CONTENT STRUCTURE EXAMPLES:
+- For vocabulary: <strong>Word</strong><br><em>pronunciation</em><br>Definition with <strong>key points</strong>
+- For concepts: <strong>Main Concept</strong><br><ul><li>Key point 1</li><li>Key point 2</li></ul>
+- For formulas: <code>Formula</code><br><strong>Where:</strong><br><ul><li>Variable 1 = explanation</li></ul>
+- For historical facts: <strong>Event/Date</strong><br><em>Context:</em> background<br><strong>Significance:</strong> importance
+
+FORMAT YOUR RESPONSE AS:
+CARD 1:
+FRONT: [Question or prompt with HTML formatting]
+BACK: [Answer or explanation with HTML formatting for better structure]
+
+CARD 2:
+FRONT: [Question or prompt with HTML formatting]
+BACK: [Answer or explanation with HTML formatting for better structure]
+
+...and so on for every requested card.
+"""
+
+# Instruction sent along with an image to extract its text
+_IMAGE_EXTRACTION_PROMPT = """
+            Please extract ALL text content from this image. Include:
+            - All visible text, headings, and labels
+            - Any structured information (lists, tables, etc.)
+            - Mathematical formulas or equations
+            - Preserve the general structure and formatting where possible
+            
+            Return only the extracted text content without any additional commentary.
+            """
+
+
+def _join_lines(text: str) -> str:
+    """Join the non-empty lines of a card side with single spaces.
+
+    Args:
+        text: Multi-line card side from the response
+
+    Returns:
+        The stripped lines joined by spaces
+    """
+    return " ".join(line for line in map(str.strip, text.splitlines()) if line)
+
+
+def _get_model(
+    api_key: str, model_name: str, system_instruction: Optional[str] = None
+) -> genai.GenerativeModel:
+    """Get the shared Gemini model for the given settings, creating it on first use.
+
+    Args:
+        api_key: Google API key the model's calls go through
+        model_name: Name of the Gemini model to use
+        system_instruction: Optional system instruction for the model
+
+    Returns:
+        The cached GenerativeModel
+    """
+    key = (api_key, model_name, system_instruction)
+    with _model_cache_lock:
+        model = _model_cache.get(key)
+        if model is None:
+            model = _model_cache[key] = genai.GenerativeModel(
+                model_name, system_instruction=system_instruction
+            )
+    return model
+
 
 class GeminiClient:
     """Client for interacting with Google's Gemini AI for OCR and content generation."""
@@ -18,8 +132,12 @@ class GeminiClient:
         if not self.api_key:
             raise ValueError("Google API key is required. Set GOOGLE_API_KEY environment variable.")
 
+        # Configure on every client, not only on a model cache miss, so file uploads
+        # (which use the process-wide client) follow this client's key
         genai.configure(api_key=self.api_key)
-        self.model = genai.GenerativeModel(model_name)
+        self.model = _get_model(self.api_key, model_name)
+        # Card generation uses its own model carrying the static card-writing guidance
+        self.cards_model = _get_model(self.api_key, model_name, _CARD_SYSTEM_INSTRUCTION)
 
     def extract_text_from_image(self, image: Image.Image) -> str:
         """Extract text content from an image using Gemini Vision.
@@ -31,17 +149,7 @@ class GeminiClient:
             Extracted text content
         """
         try:
-            prompt = """
-            Please extract ALL text content from this image. Include:
-            - All visible text, headings, and labels
-            - Any structured information (lists, tables, etc.)
-            - Mathematical formulas or equations
-            - Preserve the general structure and formatting where possible
-            
-            Return only the extracted text content without any additional commentary.
-            """
-
-            response = self.model.generate_content([prompt, image])
+            response = self.model.generate_content([_IMAGE_EXTRACTION_PROMPT, image])
             return response.text.strip()
 
         except Exception as e:
@@ -122,105 +230,114 @@ class GeminiClient:
             List of dictionaries with 'front' and 'back' keys for each card
         """
         try:
-            prompt = f"""
-            Based on the following extracted text and learning objective, create {num_cards} study cards suitable for spaced repetition learning (like Anki flashcards).
+            prompt = self._study_cards_prompt(extracted_text, learning_objective, num_cards)
+            response = self.cards_model.generate_content(prompt)
+            return self._parse_cards_response(response.text)
 
-            EXTRACTED TEXT:
-            {extracted_text}
+        except Exception as e:
+            raise Exception(f"Error generating study cards: {str(e)}")
 
-            LEARNING OBJECTIVE:
-            {learning_objective}
+    async def extract_text_from_image_async(self, image: Image.Image) -> str:
+        """Extract text content from an image without blocking the event loop.
 
-            INSTRUCTIONS:
-            1. Create exactly {num_cards} flashcards
-            2. Each card should have a clear, concise FRONT (question/prompt) and BACK (answer/explanation)
-            3. Focus on the most important information related to the learning objective
-            4. Make questions specific and testable
-            5. Include context when necessary for clarity
-            6. Vary question types (definitions, examples, applications, etc.)
-            7. Use HTML formatting to make the cards more readable and well-structured
-
-            HTML FORMATTING GUIDELINES:
-            - Use <strong> or <b> for important terms, keywords, and emphasis
-            - Use <em> or <i> for foreign words, scientific names, or subtle emphasis
-            - Use <br> for line breaks when needed
-            - Use <ul> and <li> for bullet points when listing multiple items
-            - Use <ol> and <li> for numbered lists when showing steps or rankings
-            - Use <div class="highlight"> for key concepts that need special attention
-            - Use <span style="background-color: #ffe6e6; padding: 2px 4px; border-radius: 3px;"> for critical information or warnings
-            - Use <span style="background-color: #e6f3e6; padding: 2px 4px; border-radius: 3px;"> for positive examples or correct answers
-            - Use <code> for formulas, equations, or technical terms
-            - Use <blockquote> for quotes or important excerpts
-            - For definitions: Use <strong> for the term being defined
-            - For examples: Use <em>Example:</em> to introduce examples
-            - For pronunciation: Use <span style="font-style: italic;">pronunciation guide</span>
-            - Always ensure text remains BLACK (#000000) for maximum readability
-
-            CONTENT STRUCTURE EXAMPLES:
-            - For vocabulary: <strong>Word</strong><br><em>pronunciation</em><br>Definition with <strong>key points</strong>
-            - For concepts: <strong>Main Concept</strong><br><ul><li>Key point 1</li><li>Key point 2</li></ul>
-            - For formulas: <code>Formula</code><br><strong>Where:</strong><br><ul><li>Variable 1 = explanation</li></ul>
-            - For historical facts: <strong>Event/Date</strong><br><em>Context:</em> background<br><strong>Significance:</strong> importance
-
-            FORMAT YOUR RESPONSE AS:
-            CARD 1:
-            FRONT: [Question or prompt with HTML formatting]
-            BACK: [Answer or explanation with HTML formatting for better structure]
-
-            CARD 2:
-            FRONT: [Question or prompt with HTML formatting]
-            BACK: [Answer or explanation with HTML formatting for better structure]
-
-            ...and so on for all {num_cards} cards.
-            """
+        Args:
+            image: PIL Image object
 
-            response = self.model.generate_content(prompt)
+        Returns:
+            Extracted text content
+        """
+        try:
+            response = await self.model.generate_content_async([_IMAGE_EXTRACTION_PROMPT, image])
+            return response.text.strip()
+
+        except Exception as e:
+            raise Exception(f"Error extracting text from image: {str(e)}")
+
+    async def generate_study_cards_async(
+        self, extracted_text: str, learning_objective: str, num_cards: int = 10
+    ) -> List[Dict[str, str]]:
+        """Generate study cards without blocking the event loop.
+
+        Args:
+            extracted_text: Text extracted from the image
+            learning_objective: What the user wants to learn (e.g., "vocabulary", "historical facts")
+            num_cards: Number of cards to generate
+
+        Returns:
+            List of dictionaries with 'front' and 'back' keys for each card
+        """
+        try:
+            prompt = self._study_cards_prompt(extracted_text, learning_objective, num_cards)
+            response = await self.cards_model.generate_content_async(prompt)
             return self._parse_cards_response(response.text)
 
         except Exception as e:
             raise Exception(f"Error generating study cards: {str(e)}")
 
-    def _parse_cards_response(self, response_text: str) -> List[Dict[str, str]]:
-        """Parse the AI response into structured card data.
+    async def generate_study_cards_batched(
+        self, texts: List[str], learning_objective: str, num_cards: int = 10
+    ) -> List[List[Dict[str, str]]]:
+        """Generate study cards for several texts with the requests in flight concurrently.
 
         Args:
-            response_text: Raw response from Gemini
+            texts: Texts to generate cards from, e.g. one per source or page
+            learning_objective: What the user wants to learn
+            num_cards: Number of cards to generate per text
 
         Returns:
-            List of card dictionaries
+            One list of card dictionaries per text, in input order
         """
-        cards = []
-        lines = response_text.strip().split("\n")
-        current_card = {}
+        # Created here so it belongs to the running event loop
+        semaphore = asyncio.Semaphore(_MAX_CONCURRENT_REQUESTS)
+
+        async def generate(text: str) -> List[Dict[str, str]]:
+            async with semaphore:
+                return await self.generate_study_cards_async(text, learning_objective, num_cards)
 
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
+        return list(await asyncio.gather(*(generate(text) for text in texts)))
 
-            if line.startswith("CARD "):
-                # Save previous card if exists
-                if current_card.get("front") and current_card.get("back"):
-                    cards.append(current_card)
-                current_card = {}
+    def _study_cards_prompt(
+        self, extracted_text: str, learning_objective: str, num_cards: int
+    ) -> str:
+        """Build the prompt asking Gemini for study cards.
 
-            elif line.startswith("FRONT:"):
-                current_card["front"] = line[6:].strip()
+        Args:
+            extracted_text: Source text for the cards
+            learning_objective: What the user wants to learn
+            num_cards: Number of cards to generate
+
+        Returns:
+            Prompt text
+        """
+        return f"""
+            Based on the following extracted text and learning objective, create {num_cards} study cards suitable for spaced repetition learning (like Anki flashcards).
+
+            EXTRACTED TEXT:
+            {extracted_text}
+
+            LEARNING OBJECTIVE:
+            {learning_objective}
 
-            elif line.startswith("BACK:"):
-                current_card["back"] = line[5:].strip()
+            Create exactly {num_cards} flashcards, following your card-writing instructions.
+            """
 
-            elif "front" in current_card and not current_card.get("back"):
-                # Continue front text on next line
-                current_card["front"] += " " + line
+    def _parse_cards_response(self, response_text: str) -> List[Dict[str, str]]:
+        """Parse the AI response into structured card data.
 
-            elif "back" in current_card:
-                # Continue back text on next line
-                current_card["back"] += " " + line
+        Args:
+            response_text: Raw response from Gemini
+
+        Returns:
+            List of card dictionaries
+        """
+        cards = []
+        for match in _CARD_RE.finditer(response_text):
+            front = _join_lines(match.group(1))
+            back = _join_lines(match.group(2))
 
-        # Add the last card
-        if current_card.get("front") and current_card.get("back"):
-            cards.append(current_card)
+            # Skip cards missing either side
+            if front and back:
+                cards.append({"front": front, "back": back})
 
         return cards
 
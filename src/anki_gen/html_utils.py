@@ -0,0 +1,46 @@
+"""
+HTML helpers for turning card fields into plain text.
+
+Card fields are HTML, but previews, selection labels and imported decks show
+them as plain text. Many fields are usually cleaned at once, so the batch
+helper joins them and runs a single tag-removal and entity-decoding pass.
+"""
+
+import html
+import re
+from typing import List
+
+# Matches HTML tags. Tags never span the unit separator, so several texts joined
+# with it can be cleaned in one pass.
+_HTML_TAG_RE = re.compile(r"<[^>\x1f]+>")
+_BATCH_SEP = "\x1f"
+
+
+def strip_html(text: str) -> str:
+    """Convert HTML to plain text.
+
+    Args:
+        text: Text potentially containing HTML tags and entities
+
+    Returns:
+        Text with tags removed and entities decoded
+    """
+    if "<" not in text and "&" not in text:
+        return text
+    return html.unescape(_HTML_TAG_RE.sub("", text))
+
+
+def strip_html_batch(texts: List[str]) -> List[str]:
+    """Convert several HTML snippets to plain text in a single regex pass.
+
+    Args:
+        texts: Texts potentially containing HTML tags and entities
+
+    Returns:
+        Plain-text versions of the texts, in the same order
+    """
+    joined = _BATCH_SEP.join(texts)
+    if joined.count(_BATCH_SEP) != len(texts) - 1:
+        # A text contains the separator itself, so clean each one separately
+        return [strip_html(text) for text in texts]
+    return strip_html(joined).split(_BATCH_SEP)